@@ -0,0 +1,19 @@
+"""
+Opcode cost and box I/O benchmarks for the ARC72 and ARC200 contracts
+
+Each scenario is one ABI method call simulated against deployed apps on a
+local network, see scenarios.example.json. For every call the report records
+opcode cost, boxes read and written, inner transactions and the change in
+box minimum balance, and can be compared with a previous report.
+"""
+
+from .metrics import Measurement, measure
+from .report import compare, load_report, write_report
+
+__all__ = [
+    "Measurement",
+    "compare",
+    "load_report",
+    "measure",
+    "write_report",
+]
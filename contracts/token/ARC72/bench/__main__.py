@@ -0,0 +1,56 @@
+import argparse
+import json
+import sys
+
+from algosdk.v2client.algod import AlgodClient
+
+from .report import compare, load_report, write_report
+from .runner import run_scenario
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="bench", description="Simulate ABI calls and report their cost"
+    )
+    parser.add_argument("config", help="scenario file, see scenarios.example.json")
+    parser.add_argument("-o", "--output", help="report file, default stdout")
+    parser.add_argument("-b", "--baseline", help="report to compare against")
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=0.0,
+        help="allowed growth over the baseline as a fraction, default 0",
+    )
+    args = parser.parse_args()
+    with open(args.config, encoding="utf-8") as f:
+        config = json.load(f)
+    algod = config["algod"]
+    client = AlgodClient(algod["token"], algod["url"])
+    measurements = [
+        run_scenario(
+            client,
+            config["sender"],
+            scenario,
+            config.get("extra_opcode_budget", 0),
+        )
+        for scenario in config["scenarios"]
+    ]
+    meta = {"genesis_id": client.suggested_params().gen}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            write_report(measurements, f, **meta)
+    else:
+        write_report(measurements, sys.stdout, **meta)
+    if not args.baseline:
+        return 1 if any(m.failure for m in measurements) else 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = load_report(f)
+    regressions = compare(measurements, baseline, args.tolerance)
+    for line in regressions:
+        print(line, file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import base64
+import dataclasses
+import typing
+
+# box minimum balance, 2500 + 400 * (key + value)
+BOX_FLAT_MIN_BALANCE = 2500
+BOX_BYTE_MIN_BALANCE = 400
+
+# opcodes that push box bytes, box_extract and box_get
+BOX_READ_OPCODES = frozenset((0xBA, 0xBE))
+
+BoxKey: typing.TypeAlias = tuple[int, bytes]  # (app id, box name)
+
+
+@dataclasses.dataclass
+class Measurement:
+    name: str
+    method: str
+    app_id: int
+    opcode_cost: int
+    box_reads: int
+    box_bytes_read: int
+    box_refs: int
+    box_writes: int
+    box_bytes_written: int
+    box_deletes: int
+    inner_txns: int
+    mbr_delta: int
+    failure: str | None = None
+
+
+def box_min_balance(name: bytes, size: int | None) -> int:
+    if size is None:
+        return 0
+    return BOX_FLAT_MIN_BALANCE + BOX_BYTE_MIN_BALANCE * (len(name) + size)
+
+
+def accessed_boxes(response: dict) -> set[BoxKey]:
+    """
+    Returns the boxes a simulated group touched without box references
+    """
+    boxes: set[BoxKey] = set()
+    group = response["txn-groups"][0]
+    resources = [group.get("unnamed-resources-accessed", {})]
+    for result in group["txn-results"]:
+        resources.append(result.get("unnamed-resources-accessed", {}))
+    for resource in resources:
+        for box in resource.get("boxes", []):
+            boxes.add((box["app"], base64.b64decode(box.get("name", ""))))
+    return boxes
+
+
+def box_refs(response: dict) -> int:
+    """
+    Returns the box references a simulated group needs, one per box touched
+    plus those simulate reports for the box I/O budget, each reference
+    allows 1024 bytes of boxes to be accessed
+    """
+    group = response["txn-groups"][0]
+    resources = [group.get("unnamed-resources-accessed", {})]
+    for result in group["txn-results"]:
+        resources.append(result.get("unnamed-resources-accessed", {}))
+    return len(accessed_boxes(response)) + sum(
+        resource.get("extra-box-refs", 0) for resource in resources
+    )
+
+
+def _app_id(txn_result: dict) -> int:
+    txn = txn_result["txn"]["txn"]
+    return txn.get("apid", txn_result.get("application-index", 0))
+
+
+def _walk(
+    txn_result: dict,
+    trace: dict,
+    app_id: int,
+    writes: list[tuple[BoxKey, bytes | None]],
+) -> int:
+    """
+    Collects box writes and deletes of a transaction and its inner
+    transactions in execution order, returns the inner transaction count
+    """
+    for step in trace.get("approval-program-trace", []):
+        for change in step.get("state-changes", []):
+            if change.get("app-state-type") != "b":
+                continue
+            key = (app_id, base64.b64decode(change["key"]))
+            if change["operation"] == "d":
+                writes.append((key, None))
+            else:
+                value = change.get("new-value", {}).get("bytes", "")
+                writes.append((key, base64.b64decode(value)))
+    inner_results = txn_result.get("inner-txns", [])
+    inner_traces = trace.get("inner-trace", [])
+    count = len(inner_results)
+    for inner_result, inner_trace in zip(inner_results, inner_traces):
+        count += _walk(inner_result, inner_trace, _app_id(inner_result), writes)
+    return count
+
+
+def box_changes(
+    response: dict, txn_index: int, app_id: int
+) -> tuple[list[tuple[BoxKey, bytes | None]], int]:
+    """
+    Returns the box writes of a transaction of a simulate response in order,
+    None for a delete, and its inner transaction count
+    """
+    result = response["txn-groups"][0]["txn-results"][txn_index]
+    writes: list[tuple[BoxKey, bytes | None]] = []
+    inner_txns = _walk(
+        result["txn-result"], result.get("exec-trace", {}), app_id, writes
+    )
+    return writes, inner_txns
+
+
+def app_ids(response: dict, txn_index: int, app_id: int) -> set[int]:
+    """
+    Returns the ids of the apps a transaction and its inner transactions call
+    """
+
+    def walk(txn_result: dict, app_id: int) -> typing.Iterator[int]:
+        yield app_id
+        for inner_result in txn_result.get("inner-txns", []):
+            yield from walk(inner_result, _app_id(inner_result))
+
+    result = response["txn-groups"][0]["txn-results"][txn_index]
+    return {i for i in walk(result["txn-result"], app_id) if i}
+
+
+def _walk_reads(
+    txn_result: dict, trace: dict, app_id: int, programs: dict[int, bytes]
+) -> int:
+    """
+    Returns the box bytes pushed by box_get and box_extract in a transaction
+    and its inner transactions, the opcode of a step is the program byte at
+    its pc
+    """
+    program = programs.get(app_id, b"")
+    read = 0
+    for step in trace.get("approval-program-trace", []):
+        pc = step["pc"]
+        if pc < len(program) and program[pc] in BOX_READ_OPCODES:
+            for value in step.get("stack-additions", []):
+                read += len(base64.b64decode(value.get("bytes", "")))
+    inner_results = txn_result.get("inner-txns", [])
+    inner_traces = trace.get("inner-trace", [])
+    for inner_result, inner_trace in zip(inner_results, inner_traces):
+        read += _walk_reads(
+            inner_result, inner_trace, _app_id(inner_result), programs
+        )
+    return read
+
+
+def box_bytes_read(
+    response: dict, txn_index: int, app_id: int, programs: dict[int, bytes]
+) -> int:
+    """
+    Returns the box bytes a transaction of a simulate response read
+    arguments:
+        response: simulate response with exec trace and stack changes
+        programs: approval program of every app called, by app id
+    """
+    result = response["txn-groups"][0]["txn-results"][txn_index]
+    return _walk_reads(
+        result["txn-result"], result.get("exec-trace", {}), app_id, programs
+    )
+
+
+def measure(
+    name: str,
+    method: str,
+    app_id: int,
+    response: dict,
+    txn_index: int,
+    box_sizes: dict[BoxKey, int | None],
+    programs: dict[int, bytes],
+) -> Measurement:
+    """
+    Returns the measurement of one transaction of a simulate response
+    arguments:
+        response: simulate response with exec trace and state changes
+        txn_index: index of the measured transaction in the group
+        box_sizes: size of every accessed or written box before the call,
+                   None if it did not exist
+        programs: approval program of every app called, by app id
+    box_bytes_read counts the bytes box_get and box_extract returned, while
+    box_refs counts the references the group needs for its box I/O budget,
+    which the AVM charges at the full size of each box touched.
+    """
+    group = response["txn-groups"][0]
+    result = group["txn-results"][txn_index]
+    writes, inner_txns = box_changes(response, txn_index, app_id)
+    final: dict[BoxKey, int | None] = {}
+    for key, value in writes:
+        final[key] = None if value is None else len(value)
+    mbr_delta = 0
+    for key, size in final.items():
+        mbr_delta += box_min_balance(key[1], size)
+        mbr_delta -= box_min_balance(key[1], box_sizes.get(key))
+    read = [
+        key for key in accessed_boxes(response) if box_sizes.get(key) is not None
+    ]
+    return Measurement(
+        name=name,
+        method=method,
+        app_id=app_id,
+        opcode_cost=result.get("app-budget-consumed", 0),
+        box_reads=len(read),
+        box_bytes_read=box_bytes_read(response, txn_index, app_id, programs),
+        box_refs=box_refs(response),
+        box_writes=sum(1 for _key, value in writes if value is not None),
+        box_bytes_written=sum(len(value) for _key, value in writes if value),
+        box_deletes=sum(1 for _key, value in writes if value is None),
+        inner_txns=inner_txns,
+        mbr_delta=mbr_delta,
+        failure=group.get("failure-message"),
+    )
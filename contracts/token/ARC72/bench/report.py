@@ -0,0 +1,66 @@
+import dataclasses
+import json
+import typing
+
+from .metrics import Measurement
+
+REPORT_VERSION = 2
+
+# metrics compared against a baseline, a higher value is a regression
+COMPARED_METRICS = (
+    "opcode_cost",
+    "box_reads",
+    "box_bytes_read",
+    "box_refs",
+    "box_bytes_written",
+    "inner_txns",
+    "mbr_delta",
+)
+
+
+def write_report(
+    measurements: typing.Iterable[Measurement],
+    target: typing.TextIO,
+    **meta: typing.Any,
+) -> None:
+    report = {
+        "version": REPORT_VERSION,
+        **meta,
+        "results": [dataclasses.asdict(m) for m in measurements],
+    }
+    json.dump(report, target, indent=2)
+    target.write("\n")
+
+
+def load_report(source: typing.TextIO) -> dict[str, dict]:
+    """
+    Returns the results of a report by scenario name
+    """
+    report = json.load(source)
+    assert report["version"] == REPORT_VERSION, "unsupported report version"
+    return {result["name"]: result for result in report["results"]}
+
+
+def compare(
+    measurements: typing.Iterable[Measurement],
+    baseline: dict[str, dict],
+    tolerance: float = 0.0,
+) -> list[str]:
+    """
+    Returns a line per metric that grew by more than tolerance, a fraction
+    of the baseline value, or per scenario that now fails
+    """
+    regressions = []
+    for m in measurements:
+        if m.failure:
+            regressions.append(f"{m.name}: failed: {m.failure}")
+            continue
+        previous = baseline.get(m.name)
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old = previous[metric]
+            new = getattr(m, metric)
+            if new - old > tolerance * abs(old):
+                regressions.append(f"{m.name}: {metric} {old} -> {new}")
+    return regressions
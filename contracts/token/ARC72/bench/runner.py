@@ -0,0 +1,153 @@
+import base64
+import json
+import typing
+
+from algosdk import abi, logic
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    EmptySigner,
+    TransactionWithSigner,
+)
+from algosdk.error import AlgodHTTPError
+from algosdk.transaction import PaymentTxn
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.models import SimulateRequest, SimulateTraceConfig
+
+from namehash import namehash
+
+from .metrics import (
+    BoxKey,
+    Measurement,
+    accessed_boxes,
+    app_ids,
+    box_changes,
+    measure,
+)
+
+
+def load_contract(spec_path: str) -> abi.Contract:
+    """
+    Returns the ABI contract of an arc32 app spec or a bare contract json
+    """
+    with open(spec_path, encoding="utf-8") as f:
+        spec = json.load(f)
+    return abi.Contract.undictify(spec.get("contract", spec))
+
+
+def encode_arg(value: typing.Any, arg_type: abi.ABIType, sender: str) -> typing.Any:
+    """
+    Decodes scenario arguments given as strings
+        $sender       sender address
+        utf8:foo      utf-8, zero padded to the length of a static byte array
+        node:foo.voi  namehash of a name
+        hex:00ff      bytes
+        b64:AP8=      bytes
+    anything else is passed to the ABI encoder as is
+    """
+    if not isinstance(value, str):
+        return value
+    if value == "$sender":
+        return sender
+    kind, _, data = value.partition(":")
+    if kind == "utf8":
+        encoded = data.encode("utf-8")
+        if isinstance(arg_type, abi.ArrayStaticType):
+            encoded = encoded.ljust(arg_type.static_length, b"\x00")
+        return encoded
+    if kind == "node":
+        return namehash(data)
+    if kind == "hex":
+        return bytes.fromhex(data)
+    if kind == "b64":
+        return base64.b64decode(data)
+    return value
+
+
+def _box_size(client: AlgodClient, key: BoxKey) -> int | None:
+    app_id, name = key
+    try:
+        box = client.application_box_by_name(app_id, name)
+    except AlgodHTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+    return len(base64.b64decode(box["value"]))
+
+
+def _approval_program(client: AlgodClient, app_id: int) -> bytes:
+    info = client.application_info(app_id)
+    return base64.b64decode(info["params"]["approval-program"])
+
+
+def run_scenario(
+    client: AlgodClient,
+    sender: str,
+    scenario: dict,
+    extra_opcode_budget: int = 0,
+) -> Measurement:
+    """
+    Simulates one scenario and measures its app call
+    scenario keys:
+        name: report name
+        spec: path to the app spec
+        app_id: app called
+        method: ABI method name
+        args: method arguments, see encode_arg
+        payment: optional payment to the app placed before the call
+    """
+    contract = load_contract(scenario["spec"])
+    method = contract.get_method_by_name(scenario["method"])
+    app_id = scenario["app_id"]
+    sp = client.suggested_params()
+    signer = EmptySigner()
+    atc = AtomicTransactionComposer()
+    txn_index = 0
+    if scenario.get("payment"):
+        atc.add_transaction(
+            TransactionWithSigner(
+                PaymentTxn(
+                    sender,
+                    sp,
+                    logic.get_application_address(app_id),
+                    scenario["payment"],
+                ),
+                signer,
+            )
+        )
+        txn_index = 1
+    atc.add_method_call(
+        app_id=app_id,
+        method=method,
+        sender=sender,
+        sp=sp,
+        signer=signer,
+        method_args=[
+            encode_arg(value, arg.type, sender)
+            for value, arg in zip(scenario.get("args", []), method.args)
+        ],
+    )
+    request = SimulateRequest(
+        txn_groups=[],
+        allow_empty_signatures=True,
+        allow_unnamed_resources=True,
+        extra_opcode_budget=extra_opcode_budget,
+        exec_trace_config=SimulateTraceConfig(
+            enable=True, stack_change=True, state_change=True
+        ),
+    )
+    response = atc.simulate(client, request).simulate_response
+    writes, _inner_txns = box_changes(response, txn_index, app_id)
+    keys = accessed_boxes(response) | {key for key, _value in writes}
+    box_sizes = {key: _box_size(client, key) for key in keys}
+    programs = {
+        i: _approval_program(client, i) for i in app_ids(response, txn_index, app_id)
+    }
+    return measure(
+        scenario["name"],
+        scenario["method"],
+        app_id,
+        response,
+        txn_index,
+        box_sizes,
+        programs,
+    )
@@ -26,10 +26,7 @@ arc72-cli() {
   )
 }
 arc72-pytest() {
-  (
-    cd src
-    pytest
-  )
+  pytest ${@}
 }
 arc72-demo() {
   (
@@ -43,6 +40,9 @@ arc72-demo() {
     esac
   )
 }
+arc72-bench() {
+  python -m bench ${@}
+}
 arc72-mocha() {
   (
     set -e
@@ -0,0 +1,26 @@
+"""
+Off-chain namehash matching the VNS registry and registrars
+
+    namehash("")          -> 32 zero bytes
+    namehash("foo.voi")   -> sha256(sha256(zero + sha256("voi")) + sha256("foo"))
+
+Labels are encoded as in scripts/command.ts:
+    algorand address -> 32 byte public key (ReverseRegistrar)
+    decimal number   -> 32 byte big-endian uint256 (CollectionRegistrar)
+    anything else    -> utf-8 bytes (VNSRegistrar)
+VNSRegistrar hashes numeric names such as "1337" as text, use
+numeric=False to get the node it registers.
+"""
+
+from .core import ZERO_NODE, encode_label, label_hash, namehash, subnode
+from .bulk import hash_csv, hash_names
+
+__all__ = [
+    "ZERO_NODE",
+    "encode_label",
+    "hash_csv",
+    "hash_names",
+    "label_hash",
+    "namehash",
+    "subnode",
+]
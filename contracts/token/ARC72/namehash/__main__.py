@@ -0,0 +1,42 @@
+import argparse
+import sys
+
+from .bulk import CHUNK_SIZE, hash_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="namehash", description="Namehash the names in a csv file"
+    )
+    parser.add_argument("source", help="csv file with names in the first column")
+    parser.add_argument("-o", "--output", help="output file, default stdout")
+    parser.add_argument("-w", "--workers", type=int, help="default cpu count")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--numbers",
+        action="store_true",
+        help="hash numeric labels as uint256, as namehash in command.ts does",
+    )
+    args = parser.parse_args()
+    with open(args.source, encoding="utf-8") as source:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as target:
+                hash_csv(
+                    source,
+                    target,
+                    args.numbers,
+                    args.workers,
+                    args.chunk_size,
+                )
+        else:
+            hash_csv(
+                source,
+                sys.stdout,
+                args.numbers,
+                args.workers,
+                args.chunk_size,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Bulk namehash using a process pool
+
+Names are read lazily and hashed in chunks by worker processes with a
+bounded number of chunks in flight, so memory stays flat for inputs of any
+size and results keep input order.
+"""
+
+import os
+import typing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+
+from .core import namehash
+
+CHUNK_SIZE = 10_000
+
+
+def _hash_chunk(names: list[str], numeric: bool) -> list[bytes]:
+    return [namehash(name, numeric) for name in names]
+
+
+def _chunks(names: typing.Iterable[str], size: int) -> typing.Iterator[list[str]]:
+    it = iter(names)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def hash_names(
+    names: typing.Iterable[str],
+    numeric: bool = False,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> typing.Iterator[tuple[str, bytes]]:
+    """
+    Yields (name, node) for each name, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for name in names:
+            yield name, namehash(name, numeric)
+        return
+    pending: deque[tuple[list[str], Future[list[bytes]]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in _chunks(names, chunk_size):
+            pending.append((chunk, executor.submit(_hash_chunk, chunk, numeric)))
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+
+
+def read_names(lines: typing.Iterable[str]) -> typing.Iterator[str]:
+    """
+    Yields the name in the first column of comma or space separated rows
+    such as scripts/rsvp.csv and scripts/nfd_owner_filtered.csv
+    """
+    for line in lines:
+        fields = line.replace(",", " ").split()
+        if fields:
+            yield fields[0]
+
+
+def hash_csv(
+    source: typing.TextIO,
+    target: typing.TextIO,
+    numeric: bool = False,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Writes name,node rows for each row of source, node in hex
+    Returns the number of rows written
+    """
+    count = 0
+    for name, node in hash_names(read_names(source), numeric, workers, chunk_size):
+        target.write(f"{name},{node.hex()}\n")
+        count += 1
+    return count
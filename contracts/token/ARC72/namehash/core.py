@@ -0,0 +1,93 @@
+import base64
+import hashlib
+import re
+from functools import lru_cache
+
+ZERO_NODE = bytes(32)
+
+BASE32_ALPHABET = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ234567")
+
+# whitespace trimmed by Number and BigInt in javascript
+JS_WHITESPACE = (
+    "\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+    "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+)
+
+# strings BigInt accepts, and those Number accepts that BigInt rejects
+JS_INTEGER = re.compile(r"0[xX][0-9a-fA-F]+|0[oO][0-7]+|0[bB][01]+|[+-]?[0-9]+")
+JS_RADIX = {"x": 16, "o": 8, "b": 2}
+JS_NUMBER = re.compile(r"[+-]?(Infinity|([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?)")
+
+
+def is_algorand_address(label: str) -> bool:
+    return len(label) == 58 and set(label) <= BASE32_ALPHABET
+
+
+def js_integer(label: str) -> int | None:
+    """
+    Returns the integer of a label namehash in src/scripts/command.ts treats
+    as a number, None if it is hashed as text
+
+    A label is a number when Number(label) is not NaN and is then converted
+    with BigInt(label), so hex, octal and binary literals, signs and
+    surrounding whitespace are accepted. Numbers BigInt rejects, such as
+    1.5, 1e3 or Infinity, raise ValueError as they throw there.
+    """
+    value = label.strip(JS_WHITESPACE)
+    if not value:
+        return 0
+    if JS_INTEGER.fullmatch(value):
+        return int(value, JS_RADIX.get(value[1:2].lower(), 10))
+    if JS_NUMBER.fullmatch(value):
+        raise ValueError(f"numeric label is not an integer: {label!r}")
+    return None
+
+
+def encode_label(label: str, numeric: bool = False) -> bytes:
+    """
+    Returns the bytes hashed for a label
+
+    Labels are hashed as text like VNSRegistrar. With numeric, labels that
+    namehash in src/scripts/command.ts treats as numbers are hashed as
+    uint256, negative values wrapping like its bigIntToUint8Array.
+    """
+    if is_algorand_address(label):
+        return base64.b32decode(label + "======")[:32]  # drop checksum
+    if numeric:
+        value = js_integer(label)
+        if value is not None:
+            return (value % 2**256).to_bytes(32, "big")  # uint256
+    return label.encode("utf-8")
+
+
+def label_hash(label: str, numeric: bool = False) -> bytes:
+    """
+    Returns sha256 of an encoded label
+    """
+    return hashlib.sha256(encode_label(label, numeric)).digest()
+
+
+def subnode(node: bytes, label: bytes) -> bytes:
+    """
+    Returns the node of a hashed label under node, as in VNS._setSubnodeOwner
+    """
+    return hashlib.sha256(node + label).digest()
+
+
+def namehash(name: str, numeric: bool = False) -> bytes:
+    """
+    Returns the node of a dotted name, empty labels are skipped
+    """
+    if not name:
+        return ZERO_NODE
+    label, _, parent = name.partition(".")
+    parent_node = _parent_node(parent, numeric)
+    if not label:
+        return parent_node
+    return subnode(parent_node, label_hash(label, numeric))
+
+
+@lru_cache(maxsize=1024)
+def _parent_node(name: str, numeric: bool) -> bytes:
+    # names in bulk share a few parents such as "voi", hash them once
+    return namehash(name, numeric)
@@ -17,8 +17,7 @@ from algopy import (
     itxn,
     op,
     subroutine,
-    ensure_budget,
-    OpUpFeeSource,
+    urange,
 )
 from utils import require_payment, close_offline_on_delete
 
@@ -39,7 +38,86 @@ Bytes168: typing.TypeAlias = arc4.StaticArray[arc4.Byte, typing.Literal[166]]
 Bytes256: typing.TypeAlias = arc4.StaticArray[arc4.Byte, typing.Literal[256]]
 
 mint_fee = 0
-mint_cost = 336700
+# mint_cost covers box MBR of a registration (2500 + 400 * (key + value))
+#   nft_data            69300 (38 + 129)
+#   nft_index           31700 (41 + 32)
+#   holder_balance      19700 (35 + 8)
+#   holder_tokens       32500 (43 + 32)
+#   holder_token_count  19700 (35 + 8)
+mint_cost = 172900
+
+# register_batch is bounded by the smaller of two budgets
+#   logs, 1024 bytes per transaction, each name logs a 100 byte arc72_Transfer
+#   and adds 33 bytes to the result, which is logged with a 4 byte prefix and
+#   2 byte length, 7 * 133 + 6 = 937, at most 7 names
+#   box references, 8 per app call pooled across a group of at most 16
+#   transactions. Each name touches REGISTER_NAME_BOX_REFS boxes, nft_v2 and
+#   the legacy nft_data it falls back to, nft_index, holder_tokens,
+#   holder_token_count, holder_balance and the legacy holder_data of its
+#   owner until holder data is migrated, and its record in the registry. The
+#   batch shares REGISTER_SHARED_BOX_REFS, arc72_counter, default_resolver,
+#   holder_data_migrated, the root record in the registry and the sender and
+#   treasury balances and the allowance in the payment token. With the payment
+#   and an arc200_approve and its payment in the group, 14 app calls carry 112
+#   references, (112 - 7) // 8 = 13 names
+MAX_REGISTER_BATCH = 7
+REGISTER_NAME_BOX_REFS = 8
+REGISTER_SHARED_BOX_REFS = 7
+
+# arc72_transferFromBatch logs a 100 byte arc72_Transfer per token and a
+# transaction may log 1024 bytes, larger migrations are split across calls
+MAX_TRANSFER_BATCH = 10
+
+# tokensOfOwner returns at most this many token ids per call
+MAX_TOKENS_OF_OWNER = 64
+
+# ownerOfBatch and expirationBatch serve at most this many ids per call, 31
+# values fit in the 1024 byte return log, and stop early once the remaining
+# opcode budget falls below LOOKUP_BUDGET_RESERVE
+MAX_LOOKUP_BATCH = 30
+LOOKUP_BUDGET_RESERVE = 400
+
+# resolve reads one box per text key and coin type, plus name and addr, and
+# returns them in one log of at most 1020 bytes after the 4 byte prefix. With
+# a 256 byte name and every key and coin type the fixed part is
+# 38 + 258 + 2 + 4 * 8 + 2 + 32 * 8 = 588 bytes, the texts share the rest in
+# request order and are truncated to it
+MAX_RESOLVE_TEXTS = 8
+MAX_RESOLVE_ADDRESSES = 8
+MAX_RESOLVE_RETURN = 1020
+
+# setRecords applies at most this many ops, each writes one box
+MAX_RECORD_OPS = 16
+
+# texts are written in chunks up to the box size limit and read in pages that
+# fit in the 1024 byte return log
+MAX_TEXT_LENGTH = 32768
+MAX_TEXT_RANGE = 1018
+
+# appendText is paid by the caller, a payment before it in the group covers
+# the MBR of the bytes it adds, 2500 + 400 * (key + value) and its 23 byte
+# record key entry when it creates the box and 400 per byte when it grows one
+TEXT_BOX_COST = 2500
+TEXT_BYTE_COST = 400
+
+# gcRecords deletes record boxes until the box references of a transaction are
+# used, counting the record_versions and key list boxes it reads and two boxes
+# per text and coin type address, its current and legacy layout. Texts over
+# 1024 bytes need extra references for the box I/O budget, pooled from the
+# group by the caller
+GC_BOX_REFS = 8
+
+# subnode batches are bounded by the 1024 bytes a transaction may log, events
+# and the return value included. setSubnodeOwners logs a 100 byte NewOwner and
+# returns a 32 byte node per label, 7 * 132 + 6 = 930 with the 4 byte return
+# prefix and 2 byte length. setSubnodeRecords logs NewOwner, NewResolver and
+# NewTTL, 100 + 44 + 44 = 188 bytes per label, 5 * 188 = 940. Each label
+# writes one record box
+MAX_SUBNODE_BATCH = 7
+MAX_SUBNODE_RECORD_BATCH = 5
+
+# resolvePath reads one record box per label
+MAX_RESOLVE_DEPTH = 8
 
 #                            _     _
 #   _____      ___ __   __ _| |__ | | ___
@@ -783,16 +861,75 @@ class ARC73SupportsInterface(ARC73SupportsInterfaceInterface):
 ##################################################
 
 
+# arc72_nft_data (v2)
+#   compact fixed-width record, 129 bytes
+#   token id and node are the box key and are not stored
+#   expiration is 0 for registrars without expiration and for VNSRegistrar
+#   records whose expiration is still in the legacy expires box
+#   holder_position is the 1-based slot in the owner's holder_tokens index,
+#   0 if the token has not been indexed yet
+#   label is stored zero padded with its length in label_length
+#   the mutable fields come first so they can be read and rewritten as
+#   arc72_nft_hot without touching the fields written once at mint
+
+
 class arc72_nft_data(arc4.Struct):
     owner: arc4.Address
     approved: arc4.Address
-    index: arc4.UInt256
-    token_id: arc4.UInt256
-    metadata: Bytes256
-    node: Bytes32  # VNS Namehash or Node
-    valid: arc4.Bool  # Indicates whether the domain is still valid
+    expiration: arc4.UInt64
+    index: arc4.UInt64
+    holder_position: arc4.UInt64
     registration_date: arc4.UInt64  # Timestamp of when the domain was registered
-    label: Bytes256  # Custom label or additional identifier (optional)
+    label_length: arc4.UInt8  # Length of label in bytes
+    label: Bytes32  # Custom label or additional identifier (optional)
+
+
+# arc72_nft_hot
+#   leading NFT_DATA_HOT_LENGTH bytes of arc72_nft_data
+
+
+class arc72_nft_hot(arc4.Struct):
+    owner: arc4.Address
+    approved: arc4.Address
+    expiration: arc4.UInt64
+    index: arc4.UInt64
+    holder_position: arc4.UInt64
+
+
+NFT_DATA_HOT_LENGTH = 88  # owner..holder_position
+
+# arc72_nft_data field offsets, for in place reads and writes
+NFT_DATA_OWNER_OFFSET = 0
+NFT_DATA_APPROVED_OFFSET = 32
+NFT_DATA_EXPIRATION_OFFSET = 64
+NFT_DATA_INDEX_OFFSET = 72
+NFT_DATA_HOLDER_POSITION_OFFSET = 80
+NFT_DATA_LABEL_LENGTH_OFFSET = 96
+NFT_DATA_LABEL_OFFSET = 97
+
+
+# arc72_nft_data (v1, legacy)
+#   owner: arc4.Address
+#   approved: arc4.Address
+#   index: arc4.UInt256
+#   token_id: arc4.UInt256
+#   metadata: Bytes256
+#   node: Bytes32
+#   valid: arc4.Bool
+#   registration_date: arc4.UInt64
+#   label: Bytes256
+#
+# Legacy boxes were written with Bytes256.from_bytes which does not pad, so
+# metadata is zero length and label is sized to the name. Offsets below are
+# those of the bytes actually stored, a full width record is also accepted.
+
+NFT_DATA_V1_FIXED_LENGTH = 169  # owner..registration_date without metadata
+NFT_DATA_V1_FULL_LENGTH = 681  # nominal width with padded Bytes256 fields
+NFT_DATA_V1_METADATA_OFFSET = 128  # metadata of a full width record
+
+
+# arc72_holder_data (legacy)
+#   replaced by a UInt64 balance in holder_balance, the holder is the box key
 
 
 class arc72_holder_data(arc4.Struct):
@@ -857,6 +994,16 @@ class arc72_Transfer(arc4.Struct):
     tokenId: arc4.UInt256
 
 
+class OwnerOfBatchResult(arc4.Struct):
+    served: arc4.UInt64  # number of leading tokenIds answered
+    owners: arc4.DynamicArray[arc4.Address]
+
+
+class ExpirationBatchResult(arc4.Struct):
+    served: arc4.UInt64  # number of leading tokenIds answered
+    expirations: arc4.DynamicArray[arc4.UInt256]
+
+
 class ARC72TokenCoreInterface(ARC4Contract):
     @arc4.abimethod(readonly=True)
     def arc72_ownerOf(self, tokenId: arc4.UInt256) -> arc4.Address:
@@ -1082,12 +1229,17 @@ class ARC72Token(
 ):
     def __init__(self) -> None:  # pragma: no cover
         # state (core, metadata)
-        self.nft_data = BoxMap(BigUInt, arc72_nft_data)
+        self.nft_data = BoxMap(BigUInt, arc72_nft_data, key_prefix=b"nft_v2")
+        self.nft_data_v1 = BoxMap(BigUInt, Bytes, key_prefix=b"nft_data")  # legacy
+        self.nft_metadata = BoxMap(BigUInt, Bytes256, key_prefix=b"nft_meta")
         self.nft_operators = BoxMap(Bytes, bool)
         # enumeration state
         self.totalSupply = BigUInt()
         self.nft_index = BoxMap(BigUInt, BigUInt)
-        self.holder_data = BoxMap(Account, arc72_holder_data)
+        self.holder_balance = BoxMap(Account, UInt64, key_prefix=b"hb_")
+        self.holder_data = BoxMap(Account, arc72_holder_data)  # legacy
+        self.holder_tokens = BoxMap(Bytes, arc4.UInt256, key_prefix=b"ht_")
+        self.holder_token_count = BoxMap(Account, UInt64, key_prefix=b"hc_")
 
     # core methods
 
@@ -1100,7 +1252,14 @@ class ARC72Token(
 
     @subroutine
     def _ownerOf(self, tokenId: BigUInt) -> Account:
-        return self._nft_owner(tokenId).native
+        return self._nft_data_owner(tokenId, self._nft_hot(tokenId))
+
+    @subroutine
+    def _nft_data_owner(self, tokenId: BigUInt, nft: arc72_nft_hot) -> Account:
+        """
+        Returns the owner of a loaded NFT record
+        """
+        return nft.owner.native
 
     @arc4.abimethod
     def arc72_transferFrom(
@@ -1111,24 +1270,64 @@ class ARC72Token(
         """
         self._transferFrom(from_.native, to.native, tokenId.native)
 
+    @arc4.abimethod
+    def arc72_transferFromBatch(
+        self,
+        from_: arc4.Address,
+        to: arc4.Address,
+        tokenIds: arc4.DynamicArray[arc4.UInt256],
+    ) -> None:
+        """
+        Transfers ownership of several NFTs from one holder to another
+        At most MAX_TRANSFER_BATCH tokens are moved per call
+        """
+        self._transferFromBatch(from_.native, to.native, tokenIds.copy())
+
+    @subroutine
+    def _transferFromBatch(
+        self,
+        sender: Account,
+        recipient: Account,
+        tokenIds: arc4.DynamicArray[arc4.UInt256],
+    ) -> None:
+        assert tokenIds.length <= MAX_TRANSFER_BATCH, "too many tokens"
+        for tokenId in tokenIds:
+            self._transfer_token(sender, recipient, tokenId.native)
+        if tokenIds.length > 0:
+            self._holder_add_balance(recipient, tokenIds.length)
+            self._holder_sub_balance(sender, tokenIds.length)
+
     @subroutine
     def _transferFrom(
         self, sender: Account, recipient: Account, tokenId: BigUInt
     ) -> None:
-        assert self._nft_index(tokenId) != 0, "token id not exists"
-        owner = self._ownerOf(tokenId)
+        self._transfer_token(sender, recipient, tokenId)
+        self._holder_increment_balance(recipient)
+        self._holder_decrement_balance(sender)
+
+    @subroutine
+    def _transfer_token(
+        self, sender: Account, recipient: Account, tokenId: BigUInt
+    ) -> None:
+        """
+        Moves a token to recipient and emits Transfer, balances are left to
+        the caller
+        """
+        nft = self._nft_hot(tokenId).copy()
+        assert nft.index != 0, "token id not exists"
+        owner = self._nft_data_owner(tokenId, nft)
         assert owner == sender, "sender must be owner"
         assert (
             Txn.sender == sender
-            or Txn.sender == Account.from_bytes(self._getApproved(tokenId).bytes)
-            or self._isApprovedForAll(Account.from_bytes(owner.bytes), Txn.sender)
+            or Txn.sender == nft.approved.native
+            or self._isApprovedForAll(owner, Txn.sender)
         ), "sender must be owner or approved"
-        nft = self.nft_data.get(key=tokenId, default=self._invalid_nft_data()).copy()
+        if nft.holder_position != 0:
+            self._holder_remove_token(sender, nft.holder_position.native)
         nft.owner = arc4.Address(recipient)
         nft.approved = arc4.Address(Global.zero_address)
-        self.nft_data[tokenId] = nft.copy()
-        self._holder_increment_balance(recipient)
-        self._holder_decrement_balance(sender)
+        nft.holder_position = arc4.UInt64(self._holder_push_token(recipient, tokenId))
+        self._set_nft_hot(tokenId, nft)
         arc4.emit(
             arc72_Transfer(
                 arc4.Address(sender),
@@ -1155,10 +1354,8 @@ class ARC72Token(
 
     @subroutine
     def _approve(self, owner: Account, approved: Account, tokenId: BigUInt) -> None:
-        nft = self.nft_data.get(key=tokenId, default=self._invalid_nft_data()).copy()
-        assert nft.owner == owner, "owner must be owner"
-        nft.approved = arc4.Address(approved)
-        self.nft_data[tokenId] = nft.copy()
+        assert self._nft_owner(tokenId) == owner, "owner must be owner"
+        self._set_nft_field(tokenId, NFT_DATA_APPROVED_OFFSET, approved.bytes)
         arc4.emit(
             arc72_Approval(
                 arc4.Address(owner),
@@ -1199,7 +1396,9 @@ class ARC72Token(
 
     @subroutine
     def _getApproved(self, tokenId: BigUInt) -> arc4.Address:
-        return self.nft_data.get(key=tokenId, default=self._invalid_nft_data()).approved
+        return arc4.Address.from_bytes(
+            self._nft_field(tokenId, NFT_DATA_APPROVED_OFFSET, 32)
+        )
 
     @subroutine
     def _isApprovedForAll(self, owner: Account, operator: Account) -> bool:
@@ -1214,7 +1413,7 @@ class ARC72Token(
 
     @subroutine
     def _balanceOf(self, owner: Account) -> arc4.UInt256:
-        return self._holder_balance(owner)
+        return arc4.UInt256(self._holder_balance(owner))
 
     @arc4.abimethod(readonly=True)
     def arc72_totalSupply(self) -> arc4.UInt256:
@@ -1232,6 +1431,177 @@ class ARC72Token(
     def _tokenByIndex(self, index: BigUInt) -> BigUInt:
         return self.nft_index.get(key=index, default=BigUInt(0))
 
+    # holder enumeration methods
+
+    @arc4.abimethod(readonly=True)
+    def arc72_tokenOfOwnerByIndex(
+        self, owner: arc4.Address, index: arc4.UInt256
+    ) -> arc4.UInt256:
+        """
+        Returns the token at a 0-based index of the owner's token index
+        or 0 if out of range
+        """
+        return arc4.UInt256(self._tokenOfOwnerByIndex(owner.native, index.native))
+
+    @subroutine
+    def _tokenOfOwnerByIndex(self, owner: Account, index: BigUInt) -> BigUInt:
+        if index >= BigUInt(self._holder_token_count(owner)):
+            return BigUInt(0)
+        position = op.btoi((index + 1).bytes)
+        return self.holder_tokens[self._holder_token_key(owner, position)].native
+
+    @arc4.abimethod(readonly=True)
+    def tokenCountOfOwner(self, owner: arc4.Address) -> arc4.UInt64:
+        """
+        Returns the number of tokens in the owner's token index
+        Tokens minted before the index existed are counted once indexed
+        """
+        return arc4.UInt64(self._holder_token_count(owner.native))
+
+    @arc4.abimethod(readonly=True)
+    def tokensOfOwner(
+        self, owner: arc4.Address, start: arc4.UInt64, limit: arc4.UInt64
+    ) -> arc4.DynamicArray[arc4.UInt256]:
+        """
+        Returns a page of the owner's token index
+        arguments:
+            owner: holder
+            start: 0-based index of the first token
+            limit: max number of tokens, capped at MAX_TOKENS_OF_OWNER
+        returns:
+            tokenIds: token ids, empty past the end of the index
+        """
+        tokens = arc4.DynamicArray[arc4.UInt256]()
+        count = self._holder_token_count(owner.native)
+        if start.native >= count:
+            return tokens
+        page_size = limit.native
+        if page_size > UInt64(MAX_TOKENS_OF_OWNER):
+            page_size = UInt64(MAX_TOKENS_OF_OWNER)
+        end = start.native + page_size
+        if end > count:
+            end = count
+        for position in urange(start.native + 1, end + 1):
+            tokens.append(
+                self.holder_tokens[self._holder_token_key(owner.native, position)]
+            )
+        return tokens
+
+    # batch lookup methods
+
+    @arc4.abimethod(readonly=True)
+    def ownerOfBatch(
+        self, tokenIds: arc4.DynamicArray[arc4.UInt256]
+    ) -> OwnerOfBatchResult:
+        """
+        Returns the owners of many tokens
+        arguments:
+            tokenIds: token ids
+        returns:
+            served: number of leading tokenIds answered, call again with the
+                    remaining ids if less than requested
+            owners: owner of each served token id
+        """
+        owners = arc4.DynamicArray[arc4.Address]()
+        served = UInt64(0)
+        for tokenId in tokenIds:
+            if served == MAX_LOOKUP_BATCH:
+                break
+            if Global.opcode_budget() < LOOKUP_BUDGET_RESERVE:
+                break
+            owners.append(arc4.Address(self._ownerOf(tokenId.native)))
+            served += 1
+        return OwnerOfBatchResult(arc4.UInt64(served), owners.copy())
+
+    # migration methods
+
+    @arc4.abimethod
+    def migrate_nft_data(self, tokenId: arc4.UInt256) -> arc4.Bool:
+        """
+        Migrate a legacy NFT record to the compact layout
+        Returns true if a legacy record was migrated
+        """
+        return arc4.Bool(self._migrate_nft_data(tokenId.native))
+
+    @subroutine
+    def _migrate_nft_data(self, tokenId: BigUInt) -> bool:
+        if tokenId in self.nft_data:
+            return False
+        if tokenId not in self.nft_data_v1:
+            return False
+        self._set_nft_data(tokenId, self._nft_data_v1(tokenId))
+        return True
+
+    @arc4.abimethod
+    def migrate_holder_data(self, holder: arc4.Address) -> arc4.Bool:
+        """
+        Migrate legacy holder data to a holder balance
+        Returns true if legacy holder data was migrated
+        """
+        return arc4.Bool(self._migrate_holder_data(holder.native))
+
+    @arc4.abimethod
+    def set_holder_data_migrated(self) -> None:
+        """
+        Mark legacy holder data as migrated
+        Once migrate_holder_data was called for every legacy holder, holder
+        balances stop falling back to holder data
+        """
+        assert Txn.sender == self.upgrader, "must be upgrader"
+        Box(bool, key=b"holder_data_migrated").value = True
+
+    @arc4.abimethod
+    def compact_nft_index(self, hole: arc4.UInt64) -> arc4.Bool:
+        """
+        Fill a hole left in the global index by a burn before enumeration was
+        dense, moving the token at the highest index into it
+        Returns true if a token was moved
+        """
+        return arc4.Bool(self._compact_nft_index(hole.native))
+
+    @subroutine
+    def _compact_nft_index(self, hole: UInt64) -> bool:
+        if hole == 0:
+            return False
+        if self._nft_index_key(hole) in self.nft_index:
+            return False
+        top = self._nft_index_top()
+        if hole > top:
+            return False
+        self._pop_nft_index(hole, top)
+        return True
+
+    @subroutine
+    def _migrate_holder_data(self, holder: Account) -> bool:
+        if holder in self.holder_balance:
+            return False
+        if holder not in self.holder_data:
+            return False
+        self.holder_balance[holder] = self._holder_balance_v1(holder)
+        del self.holder_data[holder]
+        return True
+
+    @arc4.abimethod
+    def index_holder_token(self, tokenId: arc4.UInt256) -> arc4.Bool:
+        """
+        Add a token minted before the holder index existed to its owner's index
+        Returns true if the token was indexed
+        """
+        return arc4.Bool(self._index_holder_token(tokenId.native))
+
+    @subroutine
+    def _index_holder_token(self, tokenId: BigUInt) -> bool:
+        nft = self._nft_hot(tokenId)
+        if nft.index == 0:
+            return False
+        if nft.holder_position != 0:
+            return False
+        position = self._holder_push_token(nft.owner.native, tokenId)
+        self._set_nft_field(
+            tokenId, NFT_DATA_HOLDER_POSITION_OFFSET, op.itob(position)
+        )
+        return True
+
     # supports methods
 
     # override _supports_interface
@@ -1262,104 +1632,335 @@ class ARC72Token(
         invalid_nft_data = arc72_nft_data(
             owner=arc4.Address(Global.zero_address),
             approved=arc4.Address(Global.zero_address),
-            index=arc4.UInt256(0),
-            token_id=arc4.UInt256(0),
-            metadata=Bytes256.from_bytes(Bytes()),
-            node=Bytes32.from_bytes(Bytes()),
-            valid=arc4.Bool(False),
+            expiration=arc4.UInt64(0),
+            index=arc4.UInt64(0),
+            holder_position=arc4.UInt64(0),
             registration_date=arc4.UInt64(0),
-            label=Bytes256.from_bytes(Bytes()),
+            label_length=arc4.UInt8(0),
+            label=Bytes32.from_bytes(Bytes.from_hex("00" * 32)),
         )
         return invalid_nft_data
 
+    # nft methods
+
     @subroutine
-    def _invalid_holder_data(self) -> arc72_holder_data:
+    def _nft_data(self, tokenId: BigUInt) -> arc72_nft_data:
         """
-        Returns invalid holder data
+        Returns the NFT data
         """
-        invalid_holder_data = arc72_holder_data(
-            holder=arc4.Address(Global.zero_address),
-            balance=arc4.UInt256(0),
+        nft_data, exists = self.nft_data.maybe(tokenId)
+        if exists:
+            return nft_data
+        return self._nft_data_v1(tokenId)
+
+    @subroutine
+    def _nft_data_v1(self, tokenId: BigUInt) -> arc72_nft_data:
+        """
+        Returns the NFT data stored in the legacy layout
+        """
+        data, exists = self.nft_data_v1.maybe(tokenId)
+        if not exists:
+            return self._invalid_nft_data()
+        offset = UInt64(NFT_DATA_V1_FIXED_LENGTH)
+        label_length = data.length - offset
+        if data.length >= NFT_DATA_V1_FULL_LENGTH:
+            offset += UInt64(256)  # padded metadata
+            label_length = UInt64(0)
+            while label_length < UInt64(32):
+                if data[offset + label_length] == Bytes.from_hex("00"):
+                    break
+                label_length += 1
+        if label_length > UInt64(32):
+            label_length = UInt64(32)
+        label = data[offset : offset + label_length]
+        return arc72_nft_data(
+            owner=arc4.Address.from_bytes(data[0:32]),
+            approved=arc4.Address.from_bytes(data[32:64]),
+            expiration=arc4.UInt64(0),
+            index=arc4.UInt64.from_bytes(data[88:96]),  # low bytes of uint256
+            holder_position=arc4.UInt64(0),  # not indexed
+            registration_date=arc4.UInt64.from_bytes(data[offset - 8 : offset]),
+            label_length=arc4.UInt8(label_length),
+            label=Bytes32.from_bytes((label + Bytes.from_hex("00" * 32))[:32]),
         )
-        return invalid_holder_data
 
-    # nft methods
+    @subroutine
+    def _set_nft_data(self, tokenId: BigUInt, nft_data: arc72_nft_data) -> None:
+        """
+        Writes the NFT data, replacing a legacy record if present
+        """
+        if tokenId not in self.nft_data:
+            metadata = self._nft_metadata_v1(tokenId)
+            if metadata.bytes != Bytes.from_hex("00" * 256):
+                self.nft_metadata[tokenId] = metadata.copy()
+            del self.nft_data_v1[tokenId]
+        self.nft_data[tokenId] = nft_data.copy()
 
     @subroutine
-    def _nft_data(self, tokenId: BigUInt) -> arc72_nft_data:
+    def _nft_hot(self, tokenId: BigUInt) -> arc72_nft_hot:
         """
-        Returns the NFT data
+        Returns the mutable fields of the NFT data
+        Only the leading bytes of a v2 record are read
+        """
+        return arc72_nft_hot.from_bytes(
+            self._nft_field(tokenId, NFT_DATA_OWNER_OFFSET, NFT_DATA_HOT_LENGTH)
+        )
+
+    @subroutine
+    def _set_nft_hot(self, tokenId: BigUInt, nft_hot: arc72_nft_hot) -> None:
+        """
+        Writes the mutable fields of the NFT data in place
+        """
+        self._set_nft_field(tokenId, NFT_DATA_OWNER_OFFSET, nft_hot.bytes)
+
+    @subroutine
+    def _nft_field(self, tokenId: BigUInt, offset: UInt64, length: UInt64) -> Bytes:
+        """
+        Returns a byte range of the NFT data
+        Only the range is read from a v2 record
+        """
+        key = self._nft_data_key(tokenId)
+        _length, exists = op.Box.length(key)
+        if exists:
+            return op.Box.extract(key, offset, length)
+        return self._nft_data_v1(tokenId).bytes[offset : offset + length]
+
+    @subroutine
+    def _set_nft_field(self, tokenId: BigUInt, offset: UInt64, value: Bytes) -> None:
+        """
+        Writes a byte range of the NFT data in place
+        A legacy record is rewritten in full as v2
+        """
+        key = self._nft_data_key(tokenId)
+        _length, exists = op.Box.length(key)
+        if exists:
+            op.Box.replace(key, offset, value)
+            return
+        data = self._nft_data_v1(tokenId).bytes
+        self._set_nft_data(
+            tokenId,
+            arc72_nft_data.from_bytes(
+                data[:offset] + value + data[offset + value.length :]
+            ),
+        )
+
+    @subroutine
+    def _nft_data_key(self, tokenId: BigUInt) -> Bytes:
+        """
+        Returns the box key of a v2 NFT record
         """
-        return self.nft_data.get(key=tokenId, default=self._invalid_nft_data())
+        return self.nft_data.key_prefix + tokenId.bytes
+
+    @subroutine
+    def _delete_nft_data(self, tokenId: BigUInt) -> None:
+        """
+        Deletes the NFT data in either layout
+        """
+        if tokenId in self.nft_data:
+            del self.nft_data[tokenId]
+        else:
+            del self.nft_data_v1[tokenId]
+        if tokenId in self.nft_metadata:
+            del self.nft_metadata[tokenId]
 
     @subroutine
-    def _nft_index(self, tokenId: BigUInt) -> BigUInt:
+    def _nft_index(self, tokenId: BigUInt) -> UInt64:
         """
         Returns the index of the NFT
         """
-        return BigUInt.from_bytes(self._nft_data(tokenId).index.bytes)
+        return op.btoi(self._nft_field(tokenId, NFT_DATA_INDEX_OFFSET, 8))
 
     @subroutine
     def _nft_metadata(self, tokenId: BigUInt) -> Bytes256:
         """
         Returns the metadata of the NFT
+        Metadata kept from a legacy record when it was migrated is returned
         """
-        return Bytes256.from_bytes(self._nft_data(tokenId).metadata.bytes[:256])
+        metadata, exists = self.nft_metadata.maybe(tokenId)
+        if exists:
+            return metadata
+        return self._nft_metadata_v1(tokenId)
+
+    @subroutine
+    def _nft_metadata_v1(self, tokenId: BigUInt) -> Bytes256:
+        """
+        Returns the metadata stored in a legacy record
+        Only a full width record carries metadata, zero otherwise
+        """
+        data, exists = self.nft_data_v1.maybe(tokenId)
+        if exists and data.length >= NFT_DATA_V1_FULL_LENGTH:
+            return Bytes256.from_bytes(
+                data[NFT_DATA_V1_METADATA_OFFSET : NFT_DATA_V1_METADATA_OFFSET + 256]
+            )
+        return Bytes256.from_bytes(Bytes.from_hex("00" * 256))
+
+    @subroutine
+    def _nft_index_key(self, index: UInt64) -> BigUInt:
+        """
+        Returns the nft_index key of an index, encoded as uint256
+        """
+        return arc4.UInt256(index).native
 
     @subroutine
     def _nft_owner(self, tokenId: BigUInt) -> arc4.Address:
         """
         Returns the owner of the NFT
         """
-        return self._nft_data(tokenId).owner
+        return arc4.Address.from_bytes(
+            self._nft_field(tokenId, NFT_DATA_OWNER_OFFSET, 32)
+        )
+
+    @subroutine
+    def _nft_label(self, tokenId: BigUInt) -> Bytes:
+        """
+        Returns the label of the NFT without padding
+        """
+        label = self._nft_field(tokenId, NFT_DATA_LABEL_LENGTH_OFFSET, 33)
+        return label[1 : 1 + op.btoi(label[:1])]
 
     # holder methods
 
     @subroutine
-    def _holder_data(self, holder: Account) -> arc72_holder_data:
+    def _holder_balance(self, holder: Account) -> UInt64:
         """
-        Returns the holder data
+        Returns the number of NFTs owned by an address
         """
-        return self.holder_data.get(key=holder, default=self._invalid_holder_data())
+        balance, exists = self.holder_balance.maybe(holder)
+        if exists:
+            return balance
+        if self._holder_data_migrated():
+            return UInt64(0)
+        return self._holder_balance_v1(holder)
 
     @subroutine
-    def _holder_balance(self, holder: Account) -> arc4.UInt256:
+    def _holder_balance_v1(self, holder: Account) -> UInt64:
         """
-        Returns the number of NFTs owned by an address
+        Returns the balance stored in legacy holder data
+        """
+        holder_data, exists = self.holder_data.maybe(holder)
+        if not exists:
+            return UInt64(0)
+        return op.btoi(holder_data.balance.bytes[24:])  # low bytes of uint256
+
+    @subroutine
+    def _holder_data_migrated(self) -> bool:
+        """
+        Returns true once legacy holder data is migrated
         """
-        return self._holder_data(holder).balance
+        return Box(bool, key=b"holder_data_migrated").get(default=False)
 
     @subroutine
-    def _holder_increment_balance(self, holder: Account) -> BigUInt:
+    def _take_holder_balance_v1(self, holder: Account) -> UInt64:
+        """
+        Returns the balance in legacy holder data and deletes it, zero
+        without a read once holder data is migrated
+        """
+        if self._holder_data_migrated():
+            return UInt64(0)
+        balance = self._holder_balance_v1(holder)
+        del self.holder_data[holder]
+        return balance
+
+    @subroutine
+    def _holder_increment_balance(self, holder: Account) -> UInt64:
         """
         Increment balance of holder
         """
-        previous_balance = BigUInt.from_bytes(self._holder_balance(holder).bytes)
-        next_balance = previous_balance + 1
-        new_holder_data = arc72_holder_data(
-            holder=arc4.Address(holder),
-            balance=arc4.UInt256(previous_balance + 1),
-        )
-        self.holder_data[holder] = new_holder_data.copy()
-        return next_balance
+        return self._holder_add_balance(holder, UInt64(1))
 
     @subroutine
-    def _holder_decrement_balance(self, holder: Account) -> BigUInt:
+    def _holder_decrement_balance(self, holder: Account) -> UInt64:
         """
         Decrement balance of holder
         """
-        previous_balance = BigUInt.from_bytes(self._holder_balance(holder).bytes)
-        next_balance = previous_balance - 1
+        return self._holder_sub_balance(holder, UInt64(1))
+
+    @subroutine
+    def _holder_add_balance(self, holder: Account, amount: UInt64) -> UInt64:
+        """
+        Add amount to balance of holder
+        """
+        balance, exists = self.holder_balance.maybe(holder)
+        if not exists:
+            balance = self._take_holder_balance_v1(holder)
+        next_balance = balance + amount
+        self.holder_balance[holder] = next_balance
+        return next_balance
+
+    @subroutine
+    def _holder_sub_balance(self, holder: Account, amount: UInt64) -> UInt64:
+        """
+        Subtract amount from balance of holder
+        """
+        balance, exists = self.holder_balance.maybe(holder)
+        if not exists:
+            balance = self._take_holder_balance_v1(holder)
+        next_balance = balance - amount
         if next_balance == 0:
-            del self.holder_data[holder]
+            del self.holder_balance[holder]
         else:
-            new_holder_data = arc72_holder_data(
-                holder=arc4.Address(holder),
-                balance=arc4.UInt256(next_balance),
-            )
-            self.holder_data[holder] = new_holder_data.copy()
+            self.holder_balance[holder] = next_balance
         return next_balance
 
+    @subroutine
+    def _delete_holder_balance(self, holder: Account) -> None:
+        """
+        Deletes the holder balance in either layout
+        """
+        if holder in self.holder_balance:
+            del self.holder_balance[holder]
+        elif not self._holder_data_migrated():
+            del self.holder_data[holder]
+
+    # holder token methods
+
+    @subroutine
+    def _holder_token_key(self, holder: Account, position: UInt64) -> Bytes:
+        """
+        Returns the holder_tokens key of a 1-based position
+        """
+        return holder.bytes + op.itob(position)
+
+    @subroutine
+    def _holder_token_count(self, holder: Account) -> UInt64:
+        """
+        Returns the number of tokens in the holder's token index
+        """
+        return self.holder_token_count.get(key=holder, default=UInt64(0))
+
+    @subroutine
+    def _holder_push_token(self, holder: Account, tokenId: BigUInt) -> UInt64:
+        """
+        Append a token to the holder's token index
+        Returns its 1-based position
+        """
+        position = self._holder_token_count(holder) + 1
+        self.holder_token_count[holder] = position
+        key = self._holder_token_key(holder, position)
+        self.holder_tokens[key] = arc4.UInt256(tokenId)
+        return position
+
+    @subroutine
+    def _holder_remove_token(self, holder: Account, position: UInt64) -> None:
+        """
+        Remove the token at a 1-based position from the holder's token index
+        The last token is moved into the freed position
+        """
+        last = self._holder_token_count(holder)
+        last_key = self._holder_token_key(holder, last)
+        if position != last:
+            moved_token = self.holder_tokens[last_key].native
+            key = self._holder_token_key(holder, position)
+            self.holder_tokens[key] = arc4.UInt256(moved_token)
+            self._set_nft_field(
+                moved_token, NFT_DATA_HOLDER_POSITION_OFFSET, op.itob(position)
+            )
+        del self.holder_tokens[last_key]
+        if last == 1:
+            del self.holder_token_count[holder]
+        else:
+            self.holder_token_count[holder] = last - 1
+
     # supply methods
 
     @subroutine
@@ -1380,6 +1981,44 @@ class ARC72Token(
         self.totalSupply = new_totalSupply
         return new_totalSupply
 
+    # index methods
+
+    @subroutine
+    def _nft_index_top(self) -> UInt64:
+        """
+        Returns the highest used index, dropping trailing holes left by burns
+        before enumeration was dense
+        """
+        counter_box = Box(BigUInt, key=b"arc72_counter")
+        counter = op.btoi(counter_box.get(default=BigUInt(0)).bytes)
+        top = counter
+        while top > 0 and self._nft_index_key(top) not in self.nft_index:
+            top -= 1
+        if top != counter:
+            counter_box.value = BigUInt(top)
+        return top
+
+    @subroutine
+    def _remove_nft_index(self, index: UInt64) -> None:
+        """
+        Remove a token from the global index, the token at the highest index
+        is moved into the freed slot so 1..totalSupply stays dense
+        """
+        self._pop_nft_index(index, self._nft_index_top())
+
+    @subroutine
+    def _pop_nft_index(self, index: UInt64, top: UInt64) -> None:
+        """
+        Move the token at top into index, then drop top
+        """
+        top_key = self._nft_index_key(top)
+        if index != top:
+            moved_token = self.nft_index[top_key]
+            self.nft_index[self._nft_index_key(index)] = moved_token
+            self._set_nft_field(moved_token, NFT_DATA_INDEX_OFFSET, op.itob(index))
+        del self.nft_index[top_key]
+        Box(BigUInt, key=b"arc72_counter").value = BigUInt(top - 1)
+
     # counter methods
 
     @subroutine
@@ -1425,12 +2064,14 @@ class OSARC72Token(ARC72Token, Upgradeable, Stakeable):
     @subroutine
     def _burn(self, nodeId: Bytes) -> None:
         bigNodeId = BigUInt.from_bytes(nodeId)
-        nft_data = self._nft_data(bigNodeId)
+        nft_data = self._nft_hot(bigNodeId)
         assert nft_data.index != 0, "token exists"
         owner = nft_data.owner
         assert owner == Txn.sender, "sender must be owner"
-        del self.nft_index[BigUInt.from_bytes(self._nft_data(bigNodeId).index.bytes)]
-        del self.nft_data[bigNodeId]
+        if nft_data.holder_position != 0:
+            self._holder_remove_token(owner.native, nft_data.holder_position.native)
+        self._remove_nft_index(nft_data.index.native)
+        self._delete_nft_data(bigNodeId)
         self._holder_decrement_balance(owner.native)
         self._decrement_totalSupply()
         arc4.emit(
@@ -1600,6 +2241,13 @@ class Record(arc4.Struct):
     approved: arc4.Address
 
 
+# Record field offsets, for in place reads and writes
+RECORD_OWNER_OFFSET = 0
+RECORD_RESOLVER_OFFSET = 32
+RECORD_TTL_OFFSET = 40
+RECORD_APPROVED_OFFSET = 48
+
+
 # Events
 #   NewOwner
 #     Logged when the owner of a node assigns a new owner to a subnode.
@@ -1954,6 +2602,77 @@ class VNS(
         """
         return self.records.get(key=node, default=self._invalid_record())
 
+    # override
+    @subroutine
+    def _record_owner(self, node: Bytes32) -> Account:
+        """
+        Returns the owner of a record
+        """
+        return arc4.Address.from_bytes(
+            self._record_field(node, RECORD_OWNER_OFFSET, 32)
+        ).native
+
+    # override
+    @subroutine
+    def _record_resolver(self, node: Bytes32) -> UInt64:
+        """
+        Returns the resolver of a record
+        """
+        return op.btoi(self._record_field(node, RECORD_RESOLVER_OFFSET, 8))
+
+    # override
+    @subroutine
+    def _record_ttl(self, node: Bytes32) -> UInt64:
+        """
+        Returns the TTL of a record
+        """
+        return op.btoi(self._record_field(node, RECORD_TTL_OFFSET, 8))
+
+    # override
+    @subroutine
+    def _record_approved(self, node: Bytes32) -> Account:
+        """
+        Returns the approved address for a record
+        """
+        return arc4.Address.from_bytes(
+            self._record_field(node, RECORD_APPROVED_OFFSET, 32)
+        ).native
+
+    @subroutine
+    def _record_field(self, node: Bytes32, offset: UInt64, length: UInt64) -> Bytes:
+        """
+        Returns a byte range of a record
+        Only the range is read from an existing record
+        """
+        key = self.records.key_prefix + node.bytes
+        _length, exists = op.Box.length(key)
+        if exists:
+            return op.Box.extract(key, offset, length)
+        return self._invalid_record().bytes[offset : offset + length]
+
+    @subroutine
+    def _set_record_field(self, node: Bytes32, offset: UInt64, value: Bytes) -> None:
+        """
+        Writes a byte range of a record in place
+        A missing record is created from the invalid record
+        """
+        key = self.records.key_prefix + node.bytes
+        _length, exists = op.Box.length(key)
+        if exists:
+            op.Box.replace(key, offset, value)
+            return
+        data = self._invalid_record().bytes
+        self.records[node] = Record.from_bytes(
+            data[:offset] + value + data[offset + value.length :]
+        )
+
+    @subroutine
+    def _owner_changing(self, node: Bytes32) -> None:
+        """
+        Called before the owner of a record is written
+        """
+        pass
+
     # vms operator methods
 
     @subroutine
@@ -2011,11 +2730,12 @@ class VNS(
         arc4.emit(Transfer(Bytes32.from_bytes(node), arc4.Address(owner)))
         arc4.emit(NewResolver(Bytes32.from_bytes(node), arc4.UInt64(resolver)))
         arc4.emit(NewTTL(Bytes32.from_bytes(node), arc4.UInt64(ttl)))
-        record = self._record(Bytes32.from_bytes(node))
-        record.owner = arc4.Address(owner)
-        record.resolver = arc4.UInt64(resolver)
-        record.ttl = arc4.UInt64(ttl)
-        self.records[Bytes32.from_bytes(node)] = record.copy()
+        self._owner_changing(Bytes32.from_bytes(node))
+        self._set_record_field(
+            Bytes32.from_bytes(node),
+            RECORD_OWNER_OFFSET,
+            owner.bytes + op.itob(resolver) + op.itob(ttl),  # owner..ttl
+        )
 
     @arc4.abimethod
     def setSubnodeRecord(
@@ -2040,11 +2760,22 @@ class VNS(
     ) -> None:
         """
         Set the record for a subnode
+        Owner, resolver and TTL are written in one box write
         """
-        # bytes32 subnode = setSubnodeOwner(node, label, owner);
-        # _setResolverAndTTL(subnode, resolver, ttl);
-        self._setSubnodeOwner(node, label, owner)
-        # here
+        subnode = op.sha256(node + label)
+        arc4.emit(
+            NewOwner(
+                Bytes32.from_bytes(node), Bytes32.from_bytes(label), arc4.Address(owner)
+            )
+        )
+        arc4.emit(NewResolver(Bytes32.from_bytes(subnode), arc4.UInt64(resolver)))
+        arc4.emit(NewTTL(Bytes32.from_bytes(subnode), arc4.UInt64(ttl)))
+        self._owner_changing(Bytes32.from_bytes(subnode))
+        self._set_record_field(
+            Bytes32.from_bytes(subnode),
+            RECORD_OWNER_OFFSET,
+            owner.bytes + op.itob(resolver) + op.itob(ttl),  # owner..ttl
+        )
 
     # override
     @arc4.abimethod
@@ -2059,6 +2790,63 @@ class VNS(
             self._setSubnodeOwner(node.bytes, label.bytes, owner.native)
         )
 
+    @arc4.abimethod
+    def setSubnodeOwners(
+        self,
+        node: Bytes32,
+        labels: arc4.DynamicArray[Bytes32],
+        owners: arc4.DynamicArray[arc4.Address],
+    ) -> arc4.DynamicArray[Bytes32]:
+        """
+        Set the owners of many subnodes of one node
+        arguments:
+            node: parent node
+            labels: label hash of each subnode
+            owners: owner of each subnode
+        returns:
+            subnodes: node of each label
+        """
+        assert labels.length == owners.length, "labels and owners must match"
+        assert labels.length <= MAX_SUBNODE_BATCH, "too many labels"
+        assert self.authorized(node), "sender must be authorized"
+        subnodes = arc4.DynamicArray[Bytes32]()
+        for i in urange(labels.length):
+            subnode = self._setSubnodeOwner(
+                node.bytes, labels[i].bytes, owners[i].native
+            )
+            subnodes.append(Bytes32.from_bytes(subnode))
+        return subnodes
+
+    @arc4.abimethod
+    def setSubnodeRecords(
+        self,
+        node: Bytes32,
+        labels: arc4.DynamicArray[Bytes32],
+        owners: arc4.DynamicArray[arc4.Address],
+        resolver: arc4.UInt64,
+        ttl: arc4.UInt64,
+    ) -> None:
+        """
+        Set the records of many subnodes of one node
+        arguments:
+            node: parent node
+            labels: label hash of each subnode
+            owners: owner of each subnode
+            resolver: resolver of every subnode
+            ttl: TTL of every subnode
+        """
+        assert labels.length == owners.length, "labels and owners must match"
+        assert labels.length <= MAX_SUBNODE_RECORD_BATCH, "too many labels"
+        self.only_owner(node)
+        for i in urange(labels.length):
+            self._setSubnodeRecord(
+                node.bytes,
+                labels[i].bytes,
+                owners[i].native,
+                resolver.native,
+                ttl.native,
+            )
+
     # override
     @subroutine
     def _setSubnodeOwner(self, node: Bytes, label: Bytes, owner: Account) -> Bytes:
@@ -2071,9 +2859,10 @@ class VNS(
                 Bytes32.from_bytes(node), Bytes32.from_bytes(label), arc4.Address(owner)
             )
         )
-        record = self._record(Bytes32.from_bytes(subnode))
-        record.owner = arc4.Address(owner)
-        self.records[Bytes32.from_bytes(subnode)] = record.copy()
+        self._owner_changing(Bytes32.from_bytes(subnode))
+        self._set_record_field(
+            Bytes32.from_bytes(subnode), RECORD_OWNER_OFFSET, owner.bytes
+        )
         return subnode
 
     # override
@@ -2091,11 +2880,11 @@ class VNS(
         """
         Set the resolver for a node
         """
-        record = self._record(Bytes32.from_bytes(node))
-        if record.resolver.native != resolver:
+        if self._record_resolver(Bytes32.from_bytes(node)) != resolver:
             arc4.emit(NewResolver(Bytes32.from_bytes(node), arc4.UInt64(resolver)))
-            record.resolver = arc4.UInt64(resolver)
-            self.records[Bytes32.from_bytes(node)] = record.copy()
+            self._set_record_field(
+                Bytes32.from_bytes(node), RECORD_RESOLVER_OFFSET, op.itob(resolver)
+            )
 
     # override
     @arc4.abimethod
@@ -2113,9 +2902,10 @@ class VNS(
         Set the owner of a node
         """
         arc4.emit(Transfer(Bytes32.from_bytes(node), arc4.Address(owner)))
-        record = self._record(Bytes32.from_bytes(node))
-        record.owner = arc4.Address(owner)
-        self.records[Bytes32.from_bytes(node)] = record.copy()
+        self._owner_changing(Bytes32.from_bytes(node))
+        self._set_record_field(
+            Bytes32.from_bytes(node), RECORD_OWNER_OFFSET, owner.bytes
+        )
 
     # override
     @arc4.abimethod
@@ -2132,11 +2922,11 @@ class VNS(
         """
         Set the TTL for a node
         """
-        record = self._record(Bytes32.from_bytes(node))
-        if record.ttl.native != ttl:
+        if self._record_ttl(Bytes32.from_bytes(node)) != ttl:
             arc4.emit(NewTTL(Bytes32.from_bytes(node), arc4.UInt64(ttl)))
-            record.ttl = arc4.UInt64(ttl)
-            self.records[Bytes32.from_bytes(node)] = record.copy()
+            self._set_record_field(
+                Bytes32.from_bytes(node), RECORD_TTL_OFFSET, op.itob(ttl)
+            )
 
     # override
     @subroutine
@@ -2154,9 +2944,9 @@ class VNS(
         Approve an address for a node
         """
         self.only_owner(Bytes32.from_bytes(node))
-        record = self._record(Bytes32.from_bytes(node))
-        record.approved = arc4.Address(to)
-        self.records[Bytes32.from_bytes(node)] = record.copy()
+        self._set_record_field(
+            Bytes32.from_bytes(node), RECORD_APPROVED_OFFSET, to.bytes
+        )
 
     # override
     @subroutine
@@ -2187,7 +2977,7 @@ class VNS(
     # override
     @subroutine
     def _recordExists(self, node: Bytes) -> bool:
-        return self._record(Bytes32.from_bytes(node)).owner != Global.zero_address
+        return self._record_owner(Bytes32.from_bytes(node)) != Global.zero_address
 
     # override
     @subroutine
@@ -2207,6 +2997,13 @@ class VNS(
         self._setTTL(node.bytes, ttl.native)
 
 
+class ResolvedPath(arc4.Struct):
+    node: Bytes32
+    record: Record
+    resolver_node: Bytes32  # nearest node on the path with a resolver
+    resolver: arc4.UInt64
+
+
 class VNSRegistry(VNS, Stakeable, Upgradeable):
     def __init__(self) -> None:
         # ownable state (in Stakeable and Upgradeable)
@@ -2222,17 +3019,20 @@ class VNSRegistry(VNS, Stakeable, Upgradeable):
         # records state
         self.registry_ttl = UInt64(DEFAULT_TTL)
         self.registry_resolver = UInt64(0)
+        # owner epoch, read by resolvers to validate their owner cache, absent
+        # on a registry updated from a version without it
+        self.owner_epoch = UInt64(0)
 
     @arc4.abimethod
     def post_update(self, resolver: arc4.UInt64) -> None:
         assert Txn.sender == self.upgrader, "must be upgrader"
         self.registry_resolver = resolver.native
         # initialize root node
-        self.records[
-            Bytes32.from_bytes(
-                Bytes.from_base64("AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA="),
-            )
-        ] = Record(
+        root_node = Bytes32.from_bytes(
+            Bytes.from_base64("AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA="),
+        )
+        self._owner_changing(root_node)
+        self.records[root_node] = Record(
             owner=arc4.Address(Global.creator_address),
             resolver=arc4.UInt64(0),
             ttl=arc4.UInt64(DEFAULT_TTL),
@@ -2246,6 +3046,68 @@ class VNSRegistry(VNS, Stakeable, Upgradeable):
         assert Txn.sender == self.upgrader, "must be upgrader"
         self.registry_resolver = resolver.native
 
+    # override
+    @subroutine
+    def _owner_changing(self, node: Bytes32) -> None:
+        """
+        Bump the owner epoch so resolvers drop their cached owner
+        Only a node with an owner can be in a resolver cache, so registering
+        a new node leaves the epoch and the caches as they are. A registry
+        updated from a version without owner_epoch has no schema slot for it
+        and skips the bump, its resolvers call VNS.ownerOf every time.
+        """
+        if self._record_owner(node) == Global.zero_address:
+            return
+        epoch, exists = op.AppGlobal.get_ex_uint64(
+            Global.current_application_id, b"owner_epoch"
+        )
+        if exists:
+            self.owner_epoch = epoch + 1
+
+    # path methods
+
+    @arc4.abimethod(readonly=True)
+    def resolvePath(self, labels: arc4.DynamicArray[Bytes32]) -> ResolvedPath:
+        """
+        Resolve a name from its label hashes
+        arguments:
+            labels: label hashes from the top level down, voi first for a.b.voi
+        returns:
+            node: namehash of the name
+            record: record of the name
+            resolver_node: the name or its nearest ancestor with a resolver,
+                           zero node if none has one
+            resolver: resolver of resolver_node, the registry resolver if
+                      none has one
+        Only nodes with a record are considered, a missing record would
+        report the registry resolver and stop the walk at the name.
+        """
+        assert labels.length <= MAX_RESOLVE_DEPTH, "too many labels"
+        node = Bytes.from_base64("AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA=")
+        nodes = Bytes()
+        for label in labels:
+            node = op.sha256(node + label.bytes)
+            nodes += node
+        resolver_node = Bytes(b"\x00" * 32)
+        resolver = UInt64(0)
+        depth = labels.length
+        while depth > 0:
+            ancestor = Bytes32.from_bytes(nodes[(depth - 1) * 32 : depth * 32])
+            if ancestor in self.records:
+                resolver = self._record_resolver(ancestor)
+                if resolver != 0:
+                    resolver_node = ancestor.bytes
+                    break
+            depth -= 1
+        if resolver == 0:
+            resolver = self.registry_resolver
+        return ResolvedPath(
+            Bytes32.from_bytes(node),
+            self._record(Bytes32.from_bytes(node)),
+            Bytes32.from_bytes(resolver_node),
+            arc4.UInt64(resolver),
+        )
+
     # terminal methods for testing
 
     @arc4.abimethod(allow_actions=[OnCompleteAction.DeleteApplication])
@@ -2256,6 +3118,7 @@ class VNSRegistry(VNS, Stakeable, Upgradeable):
     @arc4.abimethod
     def killNode(self, node: Bytes32) -> None:
         assert Txn.sender == self.upgrader, "must be upgrader"
+        self._owner_changing(node)
         del self.records[node]
 
     @arc4.abimethod
@@ -2305,21 +3168,98 @@ class VNSVersionableResolverInterface(ARC4Contract):
         return UInt64(0)
 
 
+# OwnerCache
+#   last owner check made by a resolver for a node, valid while the registry
+#   owner_epoch is unchanged
+
+
+class OwnerCache(arc4.Struct):
+    owner: arc4.Address
+    epoch: arc4.UInt64
+
+
+# record keys
+#   every record box created under a version + node prefix is listed once in
+#   record_keys[prefix] so it can be deleted once the version is cleared,
+#   each entry is a tag byte and the key suffix after the prefix zero padded
+#   to 22 bytes. A version lists at most MAX_RECORD_KEYS boxes, 736 bytes,
+#   so the list is read whole within the I/O budget of its box reference
+
+RECORD_KEY_TEXT = 0  # suffix is the text key
+RECORD_KEY_NAME = 1
+RECORD_KEY_ADDR = 2
+RECORD_KEY_ADDRESS = 3  # suffix is the coin type
+RECORD_KEY_LENGTH = 23
+MAX_RECORD_KEYS = 32
+
+
+class RecordKeyEntry(arc4.Struct):
+    tag: arc4.UInt8
+    suffix: Bytes22
+
+
 class VNSBaseResolver(VNSVersionableResolverInterface):
     def __init__(self) -> None:
         self.record_versions = BoxMap(Bytes32, UInt64, key_prefix=b"versions_")
+        self.record_keys = BoxMap(Bytes40, Bytes, key_prefix=b"keys_")
+        self.owner_cache = BoxMap(Bytes32, OwnerCache, key_prefix=b"oc_")
         self.vns = UInt64(0)
 
     @subroutine
     def authorized(self, node: Bytes32) -> None:
+        """
+        Require the sender to own node in the registry
+        The last owner seen for the node is cached and reused while no owner
+        changed in the registry, otherwise VNS.ownerOf is called. A hit saves
+        the inner call, its fee and the registry's opcode cost, a miss adds a
+        write of the node's 40 byte cache box, created once per node.
+        """
         app = Application(self.vns)
+        epoch, has_epoch = op.AppGlobal.get_ex_uint64(app, b"owner_epoch")
+        entry = OwnerCache(arc4.Address(Txn.sender), arc4.UInt64(epoch))
+        if has_epoch:
+            cache, cache_exists = self.owner_cache.maybe(node)
+            if cache_exists and cache.bytes == entry.bytes:
+                return
         owner, _txn = arc4.abi_call(VNS.ownerOf, node, app_id=app)
         assert owner == Txn.sender, "sender must be owner"
+        if has_epoch:
+            self.owner_cache[node] = entry.copy()
 
     @subroutine
     def _recordVersions(self, node: Bytes) -> UInt64:
         return self.record_versions.get(key=Bytes32.from_bytes(node), default=UInt64(0))
 
+    @subroutine
+    def _record_prefix(self, node: Bytes) -> Bytes:
+        """
+        Returns the key prefix of the current records of a node
+        """
+        return arc4.UInt64(self._recordVersions(node)).bytes + node
+
+    @subroutine
+    def _add_record_key(self, prefix: Bytes, tag: UInt64, suffix: Bytes) -> None:
+        """
+        List a newly created record box under its prefix
+        A box deleted and created again is still listed and is not added twice
+        """
+        entry = op.itob(tag)[7:] + (suffix + Bytes(b"\x00" * 22))[:22]
+        key = self.record_keys.key_prefix + prefix
+        keys, exists = op.Box.get(key)
+        if exists:
+            offset = UInt64(0)
+            while offset < keys.length:
+                if keys[offset : offset + RECORD_KEY_LENGTH] == entry:
+                    return
+                offset += RECORD_KEY_LENGTH
+            assert (
+                keys.length < MAX_RECORD_KEYS * RECORD_KEY_LENGTH
+            ), "too many records"
+            op.Box.resize(key, keys.length + RECORD_KEY_LENGTH)
+            op.Box.replace(key, keys.length, entry)
+        else:
+            self.record_keys[Bytes40.from_bytes(prefix)] = entry
+
     @arc4.abimethod
     def clearRecords(self, node: Bytes32) -> None:
         self.authorized(node)
@@ -2344,46 +3284,105 @@ class TextChanged(arc4.Struct):
     value: Bytes256
 
 
+class TextRangeChanged(arc4.Struct):
+    node: Bytes32
+    key: Bytes22
+    offset: arc4.UInt64
+    length: arc4.UInt64
+
+
 class VNSTextResolverInterface(ARC4Contract):
     @arc4.abimethod
     def text(self, node: Bytes32, key: Bytes22) -> Bytes256:
         """
-        Get the text for a node
+        Get the text for a node, the first 256 bytes of a longer text
         """
-        return Bytes256.from_bytes(self._text(node.bytes, key.bytes))
+        value = self._text(node.bytes, key.bytes, UInt64(256))
+        return Bytes256.from_bytes((value + Bytes(b"\x00" * 256))[:256])
 
     @subroutine
-    def _text(self, node: Bytes, key: Bytes) -> Bytes:
+    def _text(self, node: Bytes, key: Bytes, limit: UInt64) -> Bytes:
         """
-        Get the text for a node
+        Get the first limit bytes of the text for a node
         """
         return Bytes(b"\x00" * 256)
 
 
 class VNSTextResolver(VNSTextResolverInterface, VNSBaseResolver):
     def __init__(self) -> None:
-        self.versionable_texts = BoxMap(Bytes62, Bytes256, key_prefix=b"t_")
+        self.versionable_texts = BoxMap(Bytes62, Bytes256, key_prefix=b"t_")  # legacy
+        self.text_values = BoxMap(Bytes62, Bytes, key_prefix=b"tv_")
 
     @subroutine
-    def _text(self, node: Bytes, key: Bytes) -> Bytes:
-        record_version_bytes = arc4.UInt64(self._recordVersions(node)).bytes
-        return self.versionable_texts.get(
-            key=Bytes62.from_bytes(record_version_bytes + node + key),
-            default=Bytes256.from_bytes(Bytes(b"\x00" * 256)),
-        ).bytes
+    def _text(self, node: Bytes, key: Bytes, limit: UInt64) -> Bytes:
+        return self._text_at(self._record_prefix(node), key, limit)
+
+    @subroutine
+    def _text_at(self, prefix: Bytes, key: Bytes, limit: UInt64) -> Bytes:
+        """
+        Returns the first limit bytes of a text without padding, empty if not
+        set
+        Only that range is read, so texts larger than a stack value are served
+        """
+        box_key = self.text_values.key_prefix + prefix + key
+        length, exists = op.Box.length(box_key)
+        if exists:
+            if length > limit:
+                length = limit
+            return op.Box.extract(box_key, 0, length)
+        legacy_value, exists = self.versionable_texts.maybe(
+            Bytes62.from_bytes(prefix + key)
+        )
+        if exists:
+            value = self._trim_padding(legacy_value.bytes)
+            if value.length > limit:
+                return value[:limit]
+            return value
+        return Bytes()
+
+    @arc4.abimethod(readonly=True)
+    def textValue(self, node: Bytes32, key: Bytes22) -> arc4.DynamicBytes:
+        """
+        Get the text for a node as stored, without padding
+        Texts longer than MAX_TEXT_RANGE are truncated to it, the rest is read
+        with textRange
+        """
+        return arc4.DynamicBytes(
+            self._text(node.bytes, key.bytes, UInt64(MAX_TEXT_RANGE))
+        )
 
     @arc4.abimethod
     def setText(self, node: Bytes32, key: Bytes22, value: Bytes256) -> None:
         self.authorized(node)
         arc4.emit(TextChanged(node, key, value))
-        self._setText(node.bytes, key.bytes, value.bytes)
+        self._setText(node.bytes, key.bytes, self._trim_padding(value.bytes))
 
     @subroutine
     def _setText(self, node: Bytes, key: Bytes, value: Bytes) -> None:
-        record_version_bytes = arc4.UInt64(self._recordVersions(node)).bytes
-        self.versionable_texts[
-            Bytes62.from_bytes(record_version_bytes + node + key)
-        ] = Bytes256.from_bytes(value)
+        self._set_text_at(self._record_prefix(node), key, value)
+
+    @subroutine
+    def _set_text_at(self, prefix: Bytes, key: Bytes, value: Bytes) -> None:
+        """
+        Writes a text in a box sized to the value, an empty value deletes it
+        """
+        if value.length == 0:
+            self._delete_text_at(prefix, key)
+            return
+        text_key = Bytes62.from_bytes(prefix + key)
+        box_key = self.text_values.key_prefix + text_key.bytes
+        length, exists = op.Box.length(box_key)
+        if not exists:
+            self._add_record_key(prefix, UInt64(RECORD_KEY_TEXT), key)
+            del self.versionable_texts[text_key]
+        elif length != value.length:
+            op.Box.resize(box_key, value.length)
+        self.text_values[text_key] = value
+
+    @subroutine
+    def _delete_text_at(self, prefix: Bytes, key: Bytes) -> None:
+        del self.text_values[Bytes62.from_bytes(prefix + key)]
+        del self.versionable_texts[Bytes62.from_bytes(prefix + key)]
 
     @arc4.abimethod
     def deleteText(self, node: Bytes32, key: Bytes22) -> None:
@@ -2392,7 +3391,135 @@ class VNSTextResolver(VNSTextResolverInterface, VNSBaseResolver):
 
     @subroutine
     def _deleteText(self, node: Bytes, key: Bytes) -> None:
-        del self.versionable_texts[Bytes62.from_bytes(node + key)]
+        self._delete_text_at(self._record_prefix(node), key)
+
+    # large text methods
+
+    @arc4.abimethod
+    def appendText(
+        self, node: Bytes32, key: Bytes22, data: arc4.DynamicBytes
+    ) -> arc4.UInt64:
+        """
+        Append data to the text for a node
+        arguments:
+            node: node
+            key: text key
+            data: bytes to append
+        returns:
+            length: length of the text
+        Texts up to MAX_TEXT_LENGTH bytes are written over several calls,
+        each call needs a box reference per 1024 bytes of the text and a
+        payment before it in the group covering the MBR it adds.
+        """
+        self.authorized(node)
+        prefix = self._record_prefix(node.bytes)
+        value = data.native
+        box_key = self.text_values.key_prefix + prefix + key.bytes
+        length, exists = op.Box.length(box_key)
+        payment_amount = require_payment(Txn.sender)
+        if exists:
+            assert length + value.length <= MAX_TEXT_LENGTH, "text too long"
+            assert (
+                payment_amount >= TEXT_BYTE_COST * value.length
+            ), "payment amount accurate"
+            op.Box.resize(box_key, length + value.length)
+            op.Box.replace(box_key, length, value)
+        else:
+            current = self._text_at(prefix, key.bytes, UInt64(256))  # legacy or empty
+            length = current.length
+            assert (
+                payment_amount
+                >= TEXT_BOX_COST
+                + TEXT_BYTE_COST
+                * (box_key.length + length + value.length + RECORD_KEY_LENGTH)
+            ), "payment amount accurate"
+            self._set_text_at(prefix, key.bytes, current + value)
+        arc4.emit(
+            TextRangeChanged(node, key, arc4.UInt64(length), arc4.UInt64(value.length))
+        )
+        return arc4.UInt64(length + value.length)
+
+    @arc4.abimethod
+    def replaceText(
+        self,
+        node: Bytes32,
+        key: Bytes22,
+        offset: arc4.UInt64,
+        data: arc4.DynamicBytes,
+    ) -> None:
+        """
+        Overwrite part of the text for a node in place
+        arguments:
+            node: node
+            key: text key
+            offset: offset of the first byte to overwrite
+            data: bytes written at offset, must end within the text
+        """
+        self.authorized(node)
+        prefix = self._record_prefix(node.bytes)
+        box_key = self.text_values.key_prefix + prefix + key.bytes
+        length, exists = op.Box.length(box_key)
+        assert exists, "text not set"
+        assert offset.native + data.native.length <= length, "range out of bounds"
+        op.Box.replace(box_key, offset.native, data.native)
+        arc4.emit(
+            TextRangeChanged(node, key, offset, arc4.UInt64(data.native.length))
+        )
+
+    @arc4.abimethod(readonly=True)
+    def textRange(
+        self,
+        node: Bytes32,
+        key: Bytes22,
+        offset: arc4.UInt64,
+        length: arc4.UInt64,
+    ) -> arc4.DynamicBytes:
+        """
+        Get part of the text for a node
+        arguments:
+            node: node
+            key: text key
+            offset: offset of the first byte
+            length: number of bytes, at most MAX_TEXT_RANGE
+        returns:
+            data: bytes of the text in range, shorter at the end of the text
+        """
+        assert length.native <= MAX_TEXT_RANGE, "range too long"
+        prefix = self._record_prefix(node.bytes)
+        box_key = self.text_values.key_prefix + prefix + key.bytes
+        size, exists = op.Box.length(box_key)
+        value = Bytes()
+        if not exists:
+            value = self._text_at(prefix, key.bytes, UInt64(256))  # legacy or empty
+            size = value.length
+        start = offset.native
+        if start > size:
+            start = size
+        end = start + length.native
+        if end > size:
+            end = size
+        if exists:
+            return arc4.DynamicBytes(op.Box.extract(box_key, start, end - start))
+        return arc4.DynamicBytes(value[start:end])
+
+    @subroutine
+    def _trim_padding(self, value: Bytes) -> Bytes:
+        """
+        Strip trailing zero bytes from a value, 32 bytes at a time
+        """
+        zero = Bytes.from_hex("00" * 32)
+        end = value.length
+        while end >= 32 and value[end - 32 : end] == zero:
+            end -= 32
+        start = end - 32 if end >= 32 else UInt64(0)
+        chunk = value[start:end]
+        if BigUInt.from_bytes(chunk) == 0:
+            return Bytes()
+        # the lowest set bit of the last non zero chunk is the bitlen of
+        # chunk ^ (chunk - 1) less one
+        below = (BigUInt.from_bytes(chunk) - 1).bytes
+        end -= (op.bitlen(chunk ^ below) - 1) // 8
+        return value[:end]
 
 
 #                                                   _
@@ -2444,9 +3571,14 @@ class VNSNameResolver(VNSNameResolverInterface, VNSBaseResolver):
 
     @subroutine
     def _setName(self, node: Bytes, newName: Bytes) -> None:
-        record_version_bytes = arc4.UInt64(self._recordVersions(node)).bytes
-        self.versionable_names[Bytes40.from_bytes(record_version_bytes + node)] = (
-            Bytes256.from_bytes(newName)
+        self._set_name_at(self._record_prefix(node), newName)
+
+    @subroutine
+    def _set_name_at(self, prefix: Bytes, newName: Bytes) -> None:
+        if Bytes40.from_bytes(prefix) not in self.versionable_names:
+            self._add_record_key(prefix, UInt64(RECORD_KEY_NAME), Bytes())
+        self.versionable_names[Bytes40.from_bytes(prefix)] = Bytes256.from_bytes(
+            (newName + Bytes(b"\x00" * 256))[:256]
         )
 
     @arc4.abimethod
@@ -2513,10 +3645,13 @@ class VNSAddrResolver(VNSAddrResolverInterface, VNSBaseResolver):
 
     @subroutine
     def _setAddr(self, node: Bytes, newAddress: Account) -> None:
-        record_version_bytes = arc4.UInt64(self._recordVersions(node)).bytes
-        self.versionable_addrs[Bytes40.from_bytes(record_version_bytes + node)] = (
-            newAddress
-        )
+        self._set_addr_at(self._record_prefix(node), newAddress)
+
+    @subroutine
+    def _set_addr_at(self, prefix: Bytes, newAddress: Account) -> None:
+        if Bytes40.from_bytes(prefix) not in self.versionable_addrs:
+            self._add_record_key(prefix, UInt64(RECORD_KEY_ADDR), Bytes())
+        self.versionable_addrs[Bytes40.from_bytes(prefix)] = newAddress
 
 
 class AddressChanged(arc4.Struct):
@@ -2543,15 +3678,21 @@ class VNSAddressResolverInterface(ARC4Contract):
 
 class VNSAddressResolver(VNSAddressResolverInterface, VNSBaseResolver):
     def __init__(self) -> None:
+        # legacy, shares its prefix with versionable_addrs, read until rewritten
         self.versionable_addresses = BoxMap(Bytes48, Account, key_prefix=b"addrs_")
+        self.address_values = BoxMap(Bytes48, Account, key_prefix=b"addr2_")
 
     @subroutine
     def _address(self, node: Bytes, coinType: UInt64) -> Account:
-        record_version_bytes = arc4.UInt64(self._recordVersions(node)).bytes
-        return self.versionable_addresses.get(
-            key=Bytes48.from_bytes(record_version_bytes + node + op.itob(coinType)),
-            default=Global.zero_address,
-        )
+        return self._address_at(self._record_prefix(node), coinType)
+
+    @subroutine
+    def _address_at(self, prefix: Bytes, coinType: UInt64) -> Account:
+        key = Bytes48.from_bytes(prefix + op.itob(coinType))
+        value, exists = self.address_values.maybe(key)
+        if exists:
+            return value
+        return self.versionable_addresses.get(key=key, default=Global.zero_address)
 
     @arc4.abimethod
     def setAddress(
@@ -2563,10 +3704,19 @@ class VNSAddressResolver(VNSAddressResolverInterface, VNSBaseResolver):
 
     @subroutine
     def _setAddress(self, node: Bytes, coinType: UInt64, newAddress: Account) -> None:
-        record_version_bytes = arc4.UInt64(self._recordVersions(node)).bytes
-        self.versionable_addresses[
-            Bytes48.from_bytes(record_version_bytes + node + op.itob(coinType))
-        ] = newAddress
+        self._set_address_at(self._record_prefix(node), coinType, newAddress)
+
+    @subroutine
+    def _set_address_at(
+        self, prefix: Bytes, coinType: UInt64, newAddress: Account
+    ) -> None:
+        key = Bytes48.from_bytes(prefix + op.itob(coinType))
+        if key not in self.address_values:
+            self._add_record_key(
+                prefix, UInt64(RECORD_KEY_ADDRESS), op.itob(coinType)
+            )
+            del self.versionable_addresses[key]
+        self.address_values[key] = newAddress
 
 
 #                      _
@@ -2577,8 +3727,49 @@ class VNSAddressResolver(VNSAddressResolverInterface, VNSBaseResolver):
 #
 
 
+class ResolvedRecords(arc4.Struct):
+    name: arc4.DynamicBytes
+    addr: arc4.Address
+    texts: arc4.DynamicArray[arc4.DynamicBytes]
+    addresses: arc4.DynamicArray[arc4.Address]
+
+
+# RecordOp
+#   one write of setRecords, key is used by text ops and coinType by
+#   address ops, value is the text, name or 32 byte address
+
+RECORD_OP_SET_TEXT = 0
+RECORD_OP_DELETE_TEXT = 1
+RECORD_OP_SET_NAME = 2
+RECORD_OP_SET_ADDR = 3
+RECORD_OP_SET_ADDRESS = 4
+
+
+class RecordOp(arc4.Struct):
+    op: arc4.UInt8
+    key: Bytes22
+    coinType: arc4.UInt64
+    value: arc4.DynamicBytes
+
+
+# setRecords logs the event of each op, with its 4 byte selector
+#   TextChanged 314, NameChanged 292, AddrChanged 68, AddressChanged 76
+#   and must stay within the 1024 bytes of logs a transaction may write
+
+MAX_RECORD_LOGS = 1024
+TEXT_CHANGED_LOG = 314
+NAME_CHANGED_LOG = 292
+ADDR_CHANGED_LOG = 68
+ADDRESS_CHANGED_LOG = 76
+
+
 class VNSPublicResolver(
-    VNSNameResolver, VNSAddrResolver, VNSTextResolver, Stakeable, Upgradeable
+    VNSNameResolver,
+    VNSAddrResolver,
+    VNSAddressResolver,
+    VNSTextResolver,
+    Stakeable,
+    Upgradeable,
 ):
     def __init__(self) -> None:
         self.vns = UInt64(0)
@@ -2597,6 +3788,224 @@ class VNSPublicResolver(
     def post_update(self, vns: arc4.UInt64) -> None:
         self.vns = vns.native
 
+    # multicall methods
+
+    @arc4.abimethod(readonly=True)
+    def resolve(
+        self,
+        node: Bytes32,
+        text_keys: arc4.DynamicArray[Bytes22],
+        coin_types: arc4.DynamicArray[arc4.UInt64],
+    ) -> ResolvedRecords:
+        """
+        Resolve the name, addr, texts and addresses of a node in one call
+        arguments:
+            node: node
+            text_keys: keys of the texts to resolve
+            coin_types: coin types of the addresses to resolve
+        returns:
+            records: values in request order, name and texts without padding
+        The return value is logged and must fit in 1024 bytes, texts past
+        that budget are truncated and can be read in full with textRange.
+        """
+        assert text_keys.length <= MAX_RESOLVE_TEXTS, "too many text keys"
+        assert coin_types.length <= MAX_RESOLVE_ADDRESSES, "too many coin types"
+        prefix = arc4.UInt64(self._recordVersions(node.bytes)).bytes + node.bytes
+        name = Bytes()
+        stored_name, exists = self.versionable_names.maybe(Bytes40.from_bytes(prefix))
+        if exists:
+            name = self._trim_padding(stored_name.bytes)
+        # head, name, texts and addresses lengths, text offsets and lengths
+        remaining = MAX_RESOLVE_RETURN - (
+            38
+            + 2
+            + name.length
+            + 2
+            + 4 * text_keys.length
+            + 2
+            + 32 * coin_types.length
+        )
+        texts = arc4.DynamicArray[arc4.DynamicBytes]()
+        for key in text_keys:
+            value = self._text_at(prefix, key.bytes, remaining)
+            remaining -= value.length
+            texts.append(arc4.DynamicBytes(value))
+        addresses = arc4.DynamicArray[arc4.Address]()
+        for coin_type in coin_types:
+            addresses.append(
+                arc4.Address(self._address_at(prefix, coin_type.native))
+            )
+        return ResolvedRecords(
+            name=arc4.DynamicBytes(name),
+            addr=arc4.Address(
+                self.versionable_addrs.get(
+                    key=Bytes40.from_bytes(prefix), default=Global.zero_address
+                )
+            ),
+            texts=texts.copy(),
+            addresses=addresses.copy(),
+        )
+
+    @arc4.abimethod
+    def setRecords(self, node: Bytes32, ops: arc4.DynamicArray[RecordOp]) -> None:
+        """
+        Apply many record writes to a node in one call
+        arguments:
+            node: node
+            ops: writes, applied in order
+        The node is authorized and its record version read once. Each op
+        emits the event of its single setter, deleted texts a TextChanged
+        with an empty value, and the events must fit in the log budget.
+        """
+        assert ops.length <= MAX_RECORD_OPS, "too many ops"
+        self.authorized(node)
+        prefix = self._record_prefix(node.bytes)
+        logged = UInt64(0)
+        for record_op in ops:
+            kind = record_op.op.native
+            key = Bytes22.from_bytes(record_op.key.bytes)
+            value = record_op.value.native
+            if kind == RECORD_OP_SET_TEXT:
+                assert value.length <= 256, "text too long"
+                logged += TEXT_CHANGED_LOG
+                arc4.emit(TextChanged(node, key.copy(), self._pad_256(value)))
+                self._set_text_at(prefix, key.bytes, value)
+            elif kind == RECORD_OP_DELETE_TEXT:
+                logged += TEXT_CHANGED_LOG
+                arc4.emit(TextChanged(node, key.copy(), self._pad_256(Bytes())))
+                self._delete_text_at(prefix, key.bytes)
+            elif kind == RECORD_OP_SET_NAME:
+                assert value.length <= 256, "name too long"
+                logged += NAME_CHANGED_LOG
+                arc4.emit(NameChanged(node, self._pad_256(value)))
+                self._set_name_at(prefix, value)
+            elif kind == RECORD_OP_SET_ADDR:
+                logged += ADDR_CHANGED_LOG
+                arc4.emit(AddrChanged(node, arc4.Address(value)))
+                self._set_addr_at(prefix, Account(value))
+            elif kind == RECORD_OP_SET_ADDRESS:
+                logged += ADDRESS_CHANGED_LOG
+                arc4.emit(
+                    AddressChanged(node, record_op.coinType, arc4.Address(value))
+                )
+                self._set_address_at(
+                    prefix, record_op.coinType.native, Account(value)
+                )
+            else:
+                assert False, "unknown op"
+        assert logged <= MAX_RECORD_LOGS, "too many events"
+
+    @subroutine
+    def _pad_256(self, value: Bytes) -> Bytes256:
+        return Bytes256.from_bytes((value + Bytes(b"\x00" * 256))[:256])
+
+    # gc methods
+
+    @arc4.abimethod
+    def gcRecords(
+        self, node: Bytes32, oldVersion: arc4.UInt64, cursor: arc4.UInt64
+    ) -> arc4.UInt64:
+        """
+        Delete the record boxes of a cleared version of a node
+        arguments:
+            node: node
+            oldVersion: version replaced by clearRecords
+            cursor: 0 on the first call, then the value returned
+        returns:
+            cursor: value for the next call, 0 once the version is collected
+        Each call deletes the boxes that fit in GC_BOX_REFS references.
+        Anyone may call this, the freed MBR returns to the resolver balance.
+        """
+        assert (
+            oldVersion.native < self._recordVersions(node.bytes)
+        ), "version must be cleared"
+        prefix = oldVersion.bytes + node.bytes
+        keys_key = self.record_keys.key_prefix + prefix
+        length, exists = op.Box.length(keys_key)
+        if not exists:
+            return arc4.UInt64(0)
+        count = length // RECORD_KEY_LENGTH
+        i = cursor.native
+        refs = UInt64(2)  # record_versions and the key list
+        while i < count:
+            entry = op.Box.extract(keys_key, i * RECORD_KEY_LENGTH, RECORD_KEY_LENGTH)
+            entry_refs = self._record_box_refs(entry)
+            if refs + entry_refs > GC_BOX_REFS:
+                break
+            refs += entry_refs
+            self._delete_record_boxes(prefix, entry)
+            i += 1
+        if i >= count:
+            del self.record_keys[Bytes40.from_bytes(prefix)]
+            return arc4.UInt64(0)
+        return arc4.UInt64(i)
+
+    @arc4.abimethod
+    def gcLegacyRecords(
+        self,
+        node: Bytes32,
+        oldVersion: arc4.UInt64,
+        entries: arc4.DynamicArray[RecordKeyEntry],
+    ) -> None:
+        """
+        Delete record boxes of a cleared version by explicit key
+        arguments:
+            node: node
+            oldVersion: version replaced by clearRecords
+            entries: tag and key suffix of each box, as listed in record_keys
+        Boxes written before record_keys existed are not listed and cannot be
+        found by gcRecords. The owner of the node or the upgrader names them
+        here, as many as fit in GC_BOX_REFS references.
+        """
+        if Txn.sender != self.upgrader:
+            self.authorized(node)
+        assert (
+            oldVersion.native < self._recordVersions(node.bytes)
+        ), "version must be cleared"
+        prefix = oldVersion.bytes + node.bytes
+        refs = UInt64(2)  # record_versions and the owner cache
+        for entry in entries:
+            refs += self._record_box_refs(entry.bytes)
+            self._delete_record_boxes(prefix, entry.bytes)
+        assert refs <= GC_BOX_REFS, "too many boxes"
+
+    @subroutine
+    def _record_box_refs(self, entry: Bytes) -> UInt64:
+        """
+        Returns the number of boxes of a record_keys entry, texts and
+        addresses may also have a box in their legacy layout
+        """
+        tag = op.getbyte(entry, 0)
+        if tag == RECORD_KEY_TEXT or tag == RECORD_KEY_ADDRESS:
+            return UInt64(2)
+        return UInt64(1)
+
+    @subroutine
+    def _delete_record_boxes(self, prefix: Bytes, entry: Bytes) -> None:
+        """
+        Deletes the boxes of a record_keys entry in both layouts
+        """
+        _deleted = op.Box.delete(self._record_box_key(prefix, entry))
+        tag = op.getbyte(entry, 0)
+        if tag == RECORD_KEY_TEXT:
+            del self.versionable_texts[Bytes62.from_bytes(prefix + entry[1:])]
+        elif tag == RECORD_KEY_ADDRESS:
+            del self.versionable_addresses[Bytes48.from_bytes(prefix + entry[1:9])]
+
+    @subroutine
+    def _record_box_key(self, prefix: Bytes, entry: Bytes) -> Bytes:
+        """
+        Returns the box key of a record_keys entry
+        """
+        tag = op.getbyte(entry, 0)
+        if tag == RECORD_KEY_TEXT:
+            return self.text_values.key_prefix + prefix + entry[1:]
+        if tag == RECORD_KEY_NAME:
+            return self.versionable_names.key_prefix + prefix
+        if tag == RECORD_KEY_ADDR:
+            return self.versionable_addrs.key_prefix + prefix
+        return self.address_values.key_prefix + prefix + entry[1:9]
+
     # terminal methods for testing
 
     @arc4.abimethod(allow_actions=[OnCompleteAction.DeleteApplication])
@@ -3020,6 +4429,11 @@ class VNSRSVP(RSVP, Stakeable, Upgradeable):
 # https://github.com/ensdomains/ens-contracts/blob/staging/contracts/ethregistrar/BaseRegistrarImplementation.sol
 
 
+class RegistrationResult(arc4.Struct):
+    node: Bytes32
+    registered: arc4.Bool
+
+
 class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
     def __init__(self) -> None:
         super().__init__()
@@ -3039,7 +4453,7 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         )
         self.grace_period = UInt64(90)  # grace period
         self.controllers = BoxMap(Account, bool)  # controllers
-        self.expires = BoxMap(BigUInt, BigUInt)  # expiration timestamps
+        self.expires = BoxMap(BigUInt, BigUInt)  # legacy, now in nft_data
         self.renewal_base_fee = UInt64(1)  # renewal base fee
         self.base_cost = BigUInt(1_000_000)  # base cost (1 USDC)
         self.cost_multiplier = BigUInt(5)  # cost multiplier (5x)
@@ -3072,10 +4486,10 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         return arc4.Address(self._ownerOf(tokenId.native))
 
     @subroutine
-    def _ownerOf(self, tokenId: BigUInt) -> Account:
-        if self._expiration(tokenId) < BigUInt(Global.latest_timestamp):
+    def _nft_data_owner(self, tokenId: BigUInt, nft: arc72_nft_hot) -> Account:
+        if self._nft_expiration(tokenId, nft) < BigUInt(Global.latest_timestamp):
             return Global.current_application_address
-        return self._nft_owner(tokenId).native
+        return nft.owner.native
 
     # expiration methods
 
@@ -3085,19 +4499,93 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _expiration(self, tokenId: BigUInt) -> BigUInt:
+        return self._nft_expiration(tokenId, self._nft_hot(tokenId))
+
+    @subroutine
+    def _nft_expiration(self, tokenId: BigUInt, nft: arc72_nft_hot) -> BigUInt:
+        """
+        Returns the expiration of a record, from expires if not migrated yet
+        """
+        if nft.expiration != 0:
+            return BigUInt(nft.expiration.native)
         return self.expires.get(key=tokenId, default=BigUInt(0))
 
+    @arc4.abimethod(readonly=True)
+    def expirationBatch(
+        self, tokenIds: arc4.DynamicArray[arc4.UInt256]
+    ) -> ExpirationBatchResult:
+        """
+        Returns the expirations of many tokens
+        arguments:
+            tokenIds: token ids
+        returns:
+            served: number of leading tokenIds answered, call again with the
+                    remaining ids if less than requested
+            expirations: expiration of each served token id
+        """
+        expirations = arc4.DynamicArray[arc4.UInt256]()
+        served = UInt64(0)
+        for tokenId in tokenIds:
+            if served == MAX_LOOKUP_BATCH:
+                break
+            if Global.opcode_budget() < LOOKUP_BUDGET_RESERVE:
+                break
+            expirations.append(arc4.UInt256(self._expiration(tokenId.native)))
+            served += 1
+        return ExpirationBatchResult(arc4.UInt64(served), expirations.copy())
+
     @subroutine
     def _set_expiration(self, tokenId: BigUInt, expiration: BigUInt) -> None:
-        self.expires[tokenId] = expiration
+        self._set_nft_expiration(tokenId, self._nft_hot(tokenId), expiration)
+
+    @subroutine
+    def _set_nft_expiration(
+        self, tokenId: BigUInt, nft: arc72_nft_hot, expiration: BigUInt
+    ) -> None:
+        """
+        Writes the expiration of a record, dropping its legacy expires box
+        """
+        if nft.expiration == 0:
+            del self.expires[tokenId]
+        self._set_nft_field(
+            tokenId, NFT_DATA_EXPIRATION_OFFSET, op.itob(self._timestamp(expiration))
+        )
 
     @subroutine
     def _increment_expiration(self, tokenId: BigUInt, duration: BigUInt) -> None:
-        expiration = self._expiration(tokenId)
+        nft = self._nft_hot(tokenId)
+        expiration = self._nft_expiration(tokenId, nft)
         if expiration <= Global.latest_timestamp:
-            self._set_expiration(tokenId, Global.latest_timestamp + duration)
+            self._set_nft_expiration(tokenId, nft, Global.latest_timestamp + duration)
         else:
-            self._set_expiration(tokenId, expiration + duration)
+            self._set_nft_expiration(tokenId, nft, expiration + duration)
+
+    @subroutine
+    def _timestamp(self, value: BigUInt) -> UInt64:
+        """
+        Returns a timestamp as UInt64
+        """
+        assert value <= BigUInt(2**64 - 1), "timestamp must fit in uint64"
+        return op.btoi(arc4.UInt256(value).bytes[24:])
+
+    @arc4.abimethod
+    def migrate_expiration(self, tokenId: arc4.UInt256) -> arc4.Bool:
+        """
+        Move the expiration of a name from expires into its NFT record
+        Returns true if an expiration was migrated
+        """
+        return arc4.Bool(self._migrate_expiration(tokenId.native))
+
+    @subroutine
+    def _migrate_expiration(self, tokenId: BigUInt) -> bool:
+        expiration, exists = self.expires.maybe(tokenId)
+        if not exists:
+            return False
+        nft = self._nft_hot(tokenId)
+        if nft.index == 0:
+            return False
+        self._set_nft_expiration(tokenId, nft, expiration)
+        return True
 
     # vns methods
 
@@ -3107,6 +4595,22 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         app = Application(resolver.native)
         arc4.abi_call(VNS.setResolver, self.root_node, resolver, app_id=app)
 
+    @arc4.abimethod
+    def set_default_resolver(self, resolver: arc4.UInt64) -> None:
+        """
+        Set the resolver given to newly registered names, 0 to leave it to
+        the registry default
+        """
+        assert Txn.sender == self.owner, "only owner"
+        Box(UInt64, key=b"default_resolver").value = resolver.native
+
+    @subroutine
+    def _default_resolver(self) -> UInt64:
+        """
+        Returns the resolver given to newly registered names
+        """
+        return Box(UInt64, key=b"default_resolver").get(default=UInt64(0))
+
     @subroutine
     def is_live(self, node: Bytes32) -> bool:
         """
@@ -3129,43 +4633,69 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @arc4.abimethod
     def get_length(self, name: Bytes32) -> arc4.UInt64:
-        return arc4.UInt64(self._get_length(name.bytes))
-
-    @subroutine
-    def _get_length(self, bytes: Bytes) -> UInt64:
-        i = UInt64(0)
-        while i < UInt64(32):
-            b = bytes[i]
-            if b == Bytes.from_hex("00"):
-                break
-            i += 1
-        return i
+        length, _valid, _label = self._parse_name(name.bytes)
+        return arc4.UInt64(length)
 
     @arc4.abimethod
     def check_name(self, name: Bytes32) -> arc4.Bool:
-        ensure_budget(10000, OpUpFeeSource.GroupCredit)  # ensure budget up to 32 chars
-        return arc4.Bool(self._check_name(name.bytes[: self.get_length(name).native]))
+        _length, valid, _label = self._parse_name(name.bytes)
+        return arc4.Bool(valid)
 
     @subroutine
-    def _check_name(self, bytes: Bytes) -> bool:
-        i = UInt64(0)
-        while i < bytes.length:
-            b = bytes[i]
-            if b not in Bytes(b"0123456789abcdefghijklmnopqrstuvwxyz-"):
-                return False
-            i += 1
-        return True
+    def _parse_name(self, name: Bytes) -> tuple[UInt64, bool, Bytes]:
+        """
+        Parse a zero padded name in a single pass
+        arguments:
+            name: name, zero padded to 32 bytes
+        returns:
+            length: number of bytes before the first zero byte
+            valid: name is not empty and only contains [0-9a-z-]
+            label: sha256 of the name
+        """
+        length, invalid_index = self._scan_name(name)
+        valid = length > 0 and invalid_index == length
+        return length, valid, op.sha256(name[:length])
+
+    @subroutine
+    def _scan_name(self, word: Bytes) -> tuple[UInt64, UInt64]:
+        """
+        Index of the first zero byte and of the first byte not in [0-9a-z-]
+        of a 32 byte word, 32 if there is none
+
+        All bytes are classified at once. With the high bit of every byte
+        cleared, adding a per byte bias sets the high bit of a byte exactly
+        when it is at or above a bound and never carries into its neighbour.
+        """
+        high = Bytes.from_hex("80" * 32)
+        low = BigUInt.from_bytes(word & Bytes.from_hex("7f" * 32))
+        ge_1 = (low + BigUInt.from_bytes(Bytes.from_hex("7f" * 32))).bytes & high
+        ge_0 = (low + BigUInt.from_bytes(Bytes.from_hex("50" * 32))).bytes & high
+        gt_9 = (low + BigUInt.from_bytes(Bytes.from_hex("46" * 32))).bytes & high
+        ge_a = (low + BigUInt.from_bytes(Bytes.from_hex("1f" * 32))).bytes & high
+        gt_z = (low + BigUInt.from_bytes(Bytes.from_hex("05" * 32))).bytes & high
+        not_dash = (
+            BigUInt.from_bytes(low.bytes ^ Bytes.from_hex("2d" * 32))
+            + BigUInt.from_bytes(Bytes.from_hex("7f" * 32))
+        ).bytes & high
+        zero = ((ge_1 | word) & high) ^ high
+        valid = ((ge_0 & ~gt_9) | (ge_a & ~gt_z) | ~not_dash) & ~word & high
+        return (
+            UInt64(32) - op.bitlen(zero) // UInt64(8),
+            UInt64(32) - op.bitlen(valid ^ high) // UInt64(8),
+        )
 
     @arc4.abimethod
     def register(
         self, name: Bytes32, owner: arc4.Address, duration: arc4.UInt256
     ) -> Bytes32:
         """Register a new name"""
-        assert self.check_name(name).native, "name must be valid"
+        length, valid, label = self._parse_name(name.bytes)
+        assert valid, "name must be valid"
         unit = self.base_cost * self.cost_multiplier
         return Bytes32.from_bytes(
             self._register(
-                String.from_bytes(name.bytes[: self.get_length(name).native]),
+                String.from_bytes(name.bytes[:length]),
+                label,
                 owner.native,
                 duration.native,
                 self.payment_token,
@@ -3178,12 +4708,14 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         self, name: Bytes32, owner: arc4.Address, duration: arc4.UInt256
     ) -> Bytes32:
         "Register a new name with UNIT"
-        assert self.check_name(name).native, "name must be valid"
+        length, valid, label = self._parse_name(name.bytes)
+        assert valid, "name must be valid"
         payment_token = UInt64(420069)
         unit = BigUInt(5_000_000_000)
         return Bytes32.from_bytes(
             self._register(
-                String.from_bytes(name.bytes[: self.get_length(name).native]),
+                String.from_bytes(name.bytes[:length]),
+                label,
                 owner.native,
                 duration.native,
                 payment_token,
@@ -3217,6 +4749,7 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
     def _register(
         self,
         name: String,
+        label: Bytes,
         owner: Account,
         duration: BigUInt,
         payment_token: UInt64,
@@ -3225,24 +4758,8 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         # ------------------------------------------------------------
         # Validate registration
         # ------------------------------------------------------------
-        assert duration >= self.base_period, "duration must be at least 1 year"
-        assert duration // self.base_period > BigUInt(
-            0
-        ), "duration must be a multiple of 1 year"
-        # name validation done in check_name ie [0-9a-z-]
-        # ------------------------------------------------------------
-
-        # ------------------------------------------------------------
-        # Create node hash using namehash
-        # ------------------------------------------------------------
-        label = op.sha256(name.bytes)
-        new_node = self._namehash(name)
-        # expiration = Global.latest_timestamp + duration
-        # ------------------------------------------------------------
-
-        # ------------------------------------------------------------
-        # check if name is already registered
-        #   if name is registered err on mint
+        self._validate_duration(duration)
+        # name validation done in _parse_name ie [0-9a-z-]
         # ------------------------------------------------------------
 
         # ------------------------------------------------------------
@@ -3252,11 +4769,11 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         # ------------------------------------------------------------
         payment_amount = require_payment(Txn.sender)  # pay min amount for storage
         assert (
-            payment_amount >= mint_cost + mint_fee  # 336700 + 0
+            payment_amount >= mint_cost + mint_fee  # 172900 + 0
         ), "payment amount accurate"
         # requires allowance from Txn.sender to this contract
 
-        registration_fee = self._get_price(unit, name.bytes, duration)
+        registration_fee = self._get_price(unit, name.bytes.length, duration)
         arc4.abi_call(
             ARC200Token.arc200_transferFrom,
             arc4.Address(Txn.sender),
@@ -3266,20 +4783,65 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         )
         # ------------------------------------------------------------
 
+        return self._register_name(name, label, owner, duration)
+
+    @subroutine
+    def _validate_duration(self, duration: BigUInt) -> None:
+        assert duration >= self.base_period, "duration must be at least 1 year"
+        assert duration // self.base_period > BigUInt(
+            0
+        ), "duration must be a multiple of 1 year"
+
+    # ------------------------------------------------------------
+    # Register a paid for name (internal)
+    # - create node hash
+    # - mint node as nft
+    # - set up DNS records
+    # - set expiration
+    # ------------------------------------------------------------
+    @subroutine
+    def _register_name(
+        self, name: String, label: Bytes, owner: Account, duration: BigUInt
+    ) -> Bytes:
+        # ------------------------------------------------------------
+        # Create node hash using namehash
+        # ------------------------------------------------------------
+        new_node = self._label_node(label)
+        # ------------------------------------------------------------
+
         # ------------------------------------------------------------
-        # mint node as nft, fails if already minted
-        # token_id =
+        # check if name is already registered
+        #   if name is registered err on mint
+        # ------------------------------------------------------------
+
+        # ------------------------------------------------------------
+        # mint node as nft with expiration, fails if already minted
         # ------------------------------------------------------------
         self._mint(
             owner,
             new_node,
             name,
+            duration,
         )
         # ------------------------------------------------------------
 
         # ------------------------------------------------------------
         # Set up record
+        #   with a default resolver owner, resolver and ttl are set in
+        #   one call, otherwise the registry defaults apply
         # ------------------------------------------------------------
+        resolver = self._default_resolver()
+        if resolver != 0:
+            arc4.abi_call(
+                VNS.setSubnodeRecord,
+                self.root_node,
+                Bytes32.from_bytes(label),
+                arc4.Address(owner),
+                arc4.UInt64(resolver),
+                arc4.UInt64(DEFAULT_TTL),
+                app_id=Application(self.registry),
+            )
+            return new_node
         rnode, _txn = arc4.abi_call(
             VNS.setSubnodeOwner,
             self.root_node,
@@ -3293,14 +4855,82 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         assert rnode.bytes == new_node, "node mismatch"
         # ------------------------------------------------------------
 
-        # ------------------------------------------------------------
-        # set expiration
-        # ------------------------------------------------------------
-        self._increment_expiration(BigUInt.from_bytes(new_node), duration)
-        # ------------------------------------------------------------
-
         return new_node
 
+    # batch registration methods
+
+    @arc4.abimethod
+    def register_batch(
+        self,
+        names: arc4.DynamicArray[Bytes32],
+        owners: arc4.DynamicArray[arc4.Address],
+        duration: arc4.UInt256,
+    ) -> arc4.DynamicArray[RegistrationResult]:
+        """
+        Register many names in one call
+        arguments:
+            names: names, zero padded
+            owners: owner of each name
+            duration: duration applied to every name
+        returns:
+            results: node and whether it was registered, per name
+        Invalid or already registered names are skipped. Storage is paid
+        with one payment of mint_cost per registered name and the fees are
+        collected with a single arc200_transferFrom.
+        The caller builds the group in this order
+            arc200_approve of the fees to this application, with its payment,
+                when the allowance is not already set
+            payment of mint_cost per name to this application
+            register_batch, with the registry and the payment token as
+                foreign applications
+            nop calls to this application carrying the rest of the
+                REGISTER_NAME_BOX_REFS * names + REGISTER_SHARED_BOX_REFS box
+                references, 8 per call
+        Each name adds an inner call to the registry and the batch one to the
+        payment token, their fees are pooled from the group.
+        """
+        assert names.length == owners.length, "names and owners must match"
+        assert names.length <= MAX_REGISTER_BATCH, "too many names"
+        duration_native = duration.native
+        self._validate_duration(duration_native)
+        unit = self.base_cost * self.cost_multiplier
+        registration_fee = BigUInt(0)
+        registered = UInt64(0)
+        results = arc4.DynamicArray[RegistrationResult]()
+        for i in urange(names.length):
+            name = names[i].copy()
+            length, valid, label = self._parse_name(name.bytes)
+            node = self._label_node(label)
+            if valid and self._nft_index(BigUInt.from_bytes(node)) == 0:
+                self._register_name(
+                    String.from_bytes(name.bytes[:length]),
+                    label,
+                    owners[i].native,
+                    duration_native,
+                )
+                registration_fee += self._get_price(unit, length, duration_native)
+                registered += 1
+                results.append(
+                    RegistrationResult(Bytes32.from_bytes(node), arc4.Bool(True))
+                )
+            else:
+                results.append(
+                    RegistrationResult(Bytes32.from_bytes(node), arc4.Bool(False))
+                )
+        payment_amount = require_payment(Txn.sender)  # pay min amount for storage
+        assert (
+            payment_amount >= (mint_cost + mint_fee) * registered
+        ), "payment amount accurate"
+        if registration_fee > 0:
+            arc4.abi_call(
+                ARC200Token.arc200_transferFrom,
+                arc4.Address(Txn.sender),
+                arc4.Address(self.treasury),
+                arc4.UInt256(registration_fee),
+                app_id=Application(self.payment_token),
+            )
+        return results
+
     # renewal methods
     #  anyone can renew (extend lease)
     #  should be able to renew even if expired
@@ -3322,12 +4952,11 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         # do not require owner to renew
 
         # Verify token exists
-        nft = self._nft_data(token_id)
-        assert nft.index != 0, "name not registered"
+        assert self._nft_index(token_id) != 0, "name not registered"
         # why not let anyone renew as long as they pay?
 
         # Calculate renewal fee
-        renewal_fee = self._get_price(unit, name.bytes, duration)
+        renewal_fee = self._get_price(unit, name.bytes.length, duration)
 
         # Receive payment
         payment = require_payment(Txn.sender)
@@ -3369,6 +4998,7 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
                 to.native,
                 nodeId.bytes,
                 nodeName.native,
+                BigUInt(0),
             )
         )
 
@@ -3378,7 +5008,7 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         to: Account,
         nodeId: Bytes,
         nodeName: String,
-        # duration: BigUInt
+        duration: BigUInt,
     ) -> BigUInt:
         """
         Mint a new NFT
@@ -3406,26 +5036,27 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
             nodeId
         ).native  # simply convert nodeId to tokenId
 
-        nft_data = self._nft_data(bigTokenId)
-
         # prevent re-registration
-        assert nft_data.index == 0, "token must not exist"
+        assert self._nft_index(bigTokenId) == 0, "token must not exist"
+        assert nodeName.bytes.length <= 32, "label must be at most 32 bytes"
 
-        index = arc4.UInt256(
-            self._increment_counter()
-        ).native  # BigUInt to BigUInt(UInt256)
+        index = op.btoi(self._increment_counter().bytes)
         self._increment_totalSupply()
-        self.nft_index[index] = bigTokenId
+        self.nft_index[self._nft_index_key(index)] = bigTokenId
+        holder_position = self._holder_push_token(to, bigTokenId)
         self.nft_data[bigTokenId] = arc72_nft_data(
             owner=arc4.Address(to),
             approved=arc4.Address(Global.zero_address),
-            index=arc4.UInt256(index),
-            token_id=arc4.UInt256.from_bytes(bigTokenId.bytes),
-            metadata=Bytes256.from_bytes(Bytes()),
-            node=Bytes32.from_bytes(nodeId),
-            valid=arc4.Bool(True),
+            expiration=arc4.UInt64(
+                self._timestamp(Global.latest_timestamp + duration)
+            ),
+            index=arc4.UInt64(index),
+            holder_position=arc4.UInt64(holder_position),
             registration_date=arc4.UInt64(Global.latest_timestamp),
-            label=Bytes256.from_bytes(nodeName.bytes),
+            label_length=arc4.UInt8(nodeName.bytes.length),
+            label=Bytes32.from_bytes(
+                (nodeName.bytes + Bytes.from_hex("00" * 32))[:32]
+            ),
         )
         self._holder_increment_balance(to)
         arc4.emit(
@@ -3435,7 +5066,7 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
                 arc4.UInt256(bigTokenId),
             )
         )
-        return index
+        return BigUInt(index)
 
     # check availability using owner of
 
@@ -3474,20 +5105,20 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         returns:
             None
         """
-        self._reclaim(String.from_bytes(name.bytes[: self.get_length(name).native]))
+        _length, _valid, label = self._parse_name(name.bytes)
+        self._reclaim(label)
 
     @subroutine
-    def _reclaim(self, name: String) -> None:
+    def _reclaim(self, label: Bytes) -> None:
         """
         Sync the name with the registry (internal)
         arguments:
-            name: name
+            label: sha256 of the name
         returns:
             None
         """
 
-        label = op.sha256(name.bytes)
-        node = self._namehash(name)
+        node = self._label_node(label)
 
         token_id = BigUInt.from_bytes(node)
 
@@ -3503,6 +5134,37 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
 
         assert rnode.bytes == node, "node mismatch"
 
+    @arc4.abimethod
+    def transfer_and_reclaim(
+        self, from_: arc4.Address, to: arc4.Address, tokenId: arc4.UInt256
+    ) -> None:
+        """
+        Transfer a name and sync its registry owner in the same call
+        arguments:
+            from_: current owner
+            to: new owner
+            tokenId: token id of the name
+        returns:
+            None
+        """
+        self._transferFrom(from_.native, to.native, tokenId.native)
+        self._sync_owner(tokenId.native, to.native)
+
+    @subroutine
+    def _sync_owner(self, tokenId: BigUInt, owner: Account) -> None:
+        """
+        Set the registry owner of a name to owner
+        """
+        label = op.sha256(self._nft_label(tokenId))
+        rnode, _txn = arc4.abi_call(
+            VNS.setSubnodeOwner,
+            self.root_node,
+            Bytes32.from_bytes(label),
+            arc4.Address(owner),
+            app_id=Application(self.registry),
+        )
+        assert rnode.bytes == arc4.UInt256(tokenId).bytes, "node mismatch"
+
     # reposession methods
 
     # TODO: implement
@@ -3562,25 +5224,15 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
     def get_price(self, name: Bytes32, duration: arc4.UInt256) -> arc4.UInt64:
         """Calculate total price for registration/renewal"""
         unit = self.base_cost * self.cost_multiplier
-        return arc4.UInt64(
-            self._get_price(
-                unit,
-                name.bytes[: self._get_length(name.bytes)],
-                duration.native,
-            )
-        )
+        length, _valid, _label = self._parse_name(name.bytes)
+        return arc4.UInt64(self._get_price(unit, length, duration.native))
 
     @arc4.abimethod
     def get_price_unit(self, name: Bytes32, duration: arc4.UInt256) -> arc4.UInt256:
         """Calculate total price for registration/renewal"""
         unit = BigUInt(5_000_000_000)
-        return arc4.UInt256(
-            self._get_price(
-                unit,
-                name.bytes[: self._get_length(name.bytes)],
-                duration.native,
-            )
-        )
+        length, _valid, _label = self._parse_name(name.bytes)
+        return arc4.UInt256(self._get_price(unit, length, duration.native))
 
     # @arc4.abimethod
     # def get_price_ausd(self, name: Bytes32, duration: arc4.UInt256) -> arc4.UInt256:
@@ -3595,9 +5247,9 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
     #     )
 
     @subroutine
-    def _get_price(self, unit: BigUInt, name: Bytes, duration: BigUInt) -> BigUInt:
+    def _get_price(self, unit: BigUInt, length: UInt64, duration: BigUInt) -> BigUInt:
         """Calculate total price for registration/renewal"""
-        base = self._base_cost(unit, name.length)
+        base = self._base_cost(unit, length)
         years = duration // self.base_period
         return base * years
 
@@ -3617,7 +5269,7 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _deleteNFTData(self, token_id: BigUInt) -> None:
-        del self.nft_data[token_id]
+        self._delete_nft_data(token_id)
 
     @arc4.abimethod
     def deleteNFTOperators(self, label: arc4.UInt256) -> None:
@@ -3641,7 +5293,7 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _deleteHolderData(self, holder: Account) -> None:
-        del self.holder_data[holder]
+        self._delete_holder_balance(holder)
 
     @arc4.abimethod
     def deleteExpires(self, token_id: arc4.UInt256) -> None:
@@ -3687,7 +5339,14 @@ class VNSRegistrar(ARC72Token, Upgradeable, Stakeable):
         label_hash = op.sha256(name.bytes)
 
         # Combine with root node
-        return op.sha256(self.root_node.bytes + label_hash)
+        return self._label_node(label_hash)
+
+    @subroutine
+    def _label_node(self, label: Bytes) -> Bytes:
+        """
+        Compute node of a hashed label relative to registrar's root node
+        """
+        return op.sha256(self.root_node.bytes + label)
 
     # beacon methods
 
@@ -4057,26 +5716,25 @@ class ReverseRegistrar(ARC72Token, Upgradeable, Stakeable):
             nodeId
         ).native  # simply convert nodeId to tokenId
 
-        nft_data = self._nft_data(bigTokenId)
-
         # prevent re-registration
-        assert nft_data.index == 0, "token must not exist"
+        assert self._nft_index(bigTokenId) == 0, "token must not exist"
+        assert nodeName.bytes.length <= 32, "label must be at most 32 bytes"
 
-        index = arc4.UInt256(
-            self._increment_counter()
-        ).native  # BigUInt to BigUInt(UInt256)
+        index = op.btoi(self._increment_counter().bytes)
         self._increment_totalSupply()
-        self.nft_index[index] = bigTokenId
+        self.nft_index[self._nft_index_key(index)] = bigTokenId
+        holder_position = self._holder_push_token(to, bigTokenId)
         self.nft_data[bigTokenId] = arc72_nft_data(
             owner=arc4.Address(to),
             approved=arc4.Address(Global.zero_address),
-            index=arc4.UInt256(index),
-            token_id=arc4.UInt256.from_bytes(bigTokenId.bytes),
-            metadata=Bytes256.from_bytes(Bytes()),
-            node=Bytes32.from_bytes(nodeId),
-            valid=arc4.Bool(True),
+            expiration=arc4.UInt64(0),
+            index=arc4.UInt64(index),
+            holder_position=arc4.UInt64(holder_position),
             registration_date=arc4.UInt64(Global.latest_timestamp),
-            label=Bytes256.from_bytes(nodeName.bytes),
+            label_length=arc4.UInt8(nodeName.bytes.length),
+            label=Bytes32.from_bytes(
+                (nodeName.bytes + Bytes.from_hex("00" * 32))[:32]
+            ),
         )
         self._holder_increment_balance(to)
         arc4.emit(
@@ -4221,7 +5879,7 @@ class ReverseRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _deleteNFTData(self, token_id: BigUInt) -> None:
-        del self.nft_data[token_id]
+        self._delete_nft_data(token_id)
 
     @arc4.abimethod
     def deleteNFTOperators(self, label: arc4.UInt256) -> None:
@@ -4245,7 +5903,7 @@ class ReverseRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _deleteHolderData(self, holder: Account) -> None:
-        del self.holder_data[holder]
+        self._delete_holder_balance(holder)
 
     # @arc4.abimethod
     # def deleteExpires(self, token_id: arc4.UInt256) -> None:
@@ -4311,6 +5969,18 @@ class ReverseRegistrar(ARC72Token, Upgradeable, Stakeable):
         """
         pass
 
+    @arc4.abimethod
+    def arc72_transferFromBatch(
+        self,
+        from_: arc4.Address,
+        to: arc4.Address,
+        tokenIds: arc4.DynamicArray[arc4.UInt256],
+    ) -> None:
+        """
+        Transfers ownership of several NFTs
+        """
+        pass
+
     # payment methods
 
     @arc4.abimethod
@@ -4664,26 +6334,25 @@ class CollectionRegistrar(ARC72Token, Upgradeable, Stakeable):
             nodeId
         ).native  # simply convert nodeId to tokenId
 
-        nft_data = self._nft_data(bigTokenId)
-
         # prevent re-registration
-        assert nft_data.index == 0, "token must not exist"
+        assert self._nft_index(bigTokenId) == 0, "token must not exist"
+        assert nodeName.bytes.length <= 32, "label must be at most 32 bytes"
 
-        index = arc4.UInt256(
-            self._increment_counter()
-        ).native  # BigUInt to BigUInt(UInt256)
+        index = op.btoi(self._increment_counter().bytes)
         self._increment_totalSupply()
-        self.nft_index[index] = bigTokenId
+        self.nft_index[self._nft_index_key(index)] = bigTokenId
+        holder_position = self._holder_push_token(to, bigTokenId)
         self.nft_data[bigTokenId] = arc72_nft_data(
             owner=arc4.Address(to),
             approved=arc4.Address(Global.zero_address),
-            index=arc4.UInt256(index),
-            token_id=arc4.UInt256.from_bytes(bigTokenId.bytes),
-            metadata=Bytes256.from_bytes(Bytes()),
-            node=Bytes32.from_bytes(nodeId),
-            valid=arc4.Bool(True),
+            expiration=arc4.UInt64(0),
+            index=arc4.UInt64(index),
+            holder_position=arc4.UInt64(holder_position),
             registration_date=arc4.UInt64(Global.latest_timestamp),
-            label=Bytes256.from_bytes(nodeName.bytes),
+            label_length=arc4.UInt8(nodeName.bytes.length),
+            label=Bytes32.from_bytes(
+                (nodeName.bytes + Bytes.from_hex("00" * 32))[:32]
+            ),
         )
         self._holder_increment_balance(to)
         arc4.emit(
@@ -4828,7 +6497,7 @@ class CollectionRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _deleteNFTData(self, token_id: BigUInt) -> None:
-        del self.nft_data[token_id]
+        self._delete_nft_data(token_id)
 
     @arc4.abimethod
     def deleteNFTOperators(self, label: arc4.UInt256) -> None:
@@ -4852,7 +6521,7 @@ class CollectionRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _deleteHolderData(self, holder: Account) -> None:
-        del self.holder_data[holder]
+        self._delete_holder_balance(holder)
 
     # @arc4.abimethod
     # def deleteExpires(self, token_id: arc4.UInt256) -> None:
@@ -4918,6 +6587,18 @@ class CollectionRegistrar(ARC72Token, Upgradeable, Stakeable):
         """
         pass
 
+    @arc4.abimethod
+    def arc72_transferFromBatch(
+        self,
+        from_: arc4.Address,
+        to: arc4.Address,
+        tokenIds: arc4.DynamicArray[arc4.UInt256],
+    ) -> None:
+        """
+        Transfers ownership of several NFTs
+        """
+        pass
+
     # payment methods
 
     @arc4.abimethod
@@ -5281,26 +6962,25 @@ class StakingRegistrar(ARC72Token, Upgradeable, Stakeable):
             nodeId
         ).native  # simply convert nodeId to tokenId
 
-        nft_data = self._nft_data(bigTokenId)
-
         # prevent re-registration
-        assert nft_data.index == 0, "token must not exist"
+        assert self._nft_index(bigTokenId) == 0, "token must not exist"
+        assert nodeName.bytes.length <= 32, "label must be at most 32 bytes"
 
-        index = arc4.UInt256(
-            self._increment_counter()
-        ).native  # BigUInt to BigUInt(UInt256)
+        index = op.btoi(self._increment_counter().bytes)
         self._increment_totalSupply()
-        self.nft_index[index] = bigTokenId
+        self.nft_index[self._nft_index_key(index)] = bigTokenId
+        holder_position = self._holder_push_token(to, bigTokenId)
         self.nft_data[bigTokenId] = arc72_nft_data(
             owner=arc4.Address(to),
             approved=arc4.Address(Global.zero_address),
-            index=arc4.UInt256(index),
-            token_id=arc4.UInt256.from_bytes(bigTokenId.bytes),
-            metadata=Bytes256.from_bytes(Bytes()),
-            node=Bytes32.from_bytes(nodeId),
-            valid=arc4.Bool(True),
+            expiration=arc4.UInt64(0),
+            index=arc4.UInt64(index),
+            holder_position=arc4.UInt64(holder_position),
             registration_date=arc4.UInt64(Global.latest_timestamp),
-            label=Bytes256.from_bytes(nodeName.bytes),
+            label_length=arc4.UInt8(nodeName.bytes.length),
+            label=Bytes32.from_bytes(
+                (nodeName.bytes + Bytes.from_hex("00" * 32))[:32]
+            ),
         )
         self._holder_increment_balance(to)
         arc4.emit(
@@ -5445,7 +7125,7 @@ class StakingRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _deleteNFTData(self, token_id: BigUInt) -> None:
-        del self.nft_data[token_id]
+        self._delete_nft_data(token_id)
 
     @arc4.abimethod
     def deleteNFTOperators(self, label: arc4.UInt256) -> None:
@@ -5469,7 +7149,7 @@ class StakingRegistrar(ARC72Token, Upgradeable, Stakeable):
 
     @subroutine
     def _deleteHolderData(self, holder: Account) -> None:
-        del self.holder_data[holder]
+        self._delete_holder_balance(holder)
 
     # @arc4.abimethod
     # def deleteExpires(self, token_id: arc4.UInt256) -> None:
@@ -5535,6 +7215,18 @@ class StakingRegistrar(ARC72Token, Upgradeable, Stakeable):
         """
         pass
 
+    @arc4.abimethod
+    def arc72_transferFromBatch(
+        self,
+        from_: arc4.Address,
+        to: arc4.Address,
+        tokenIds: arc4.DynamicArray[arc4.UInt256],
+    ) -> None:
+        """
+        Transfers ownership of several NFTs
+        """
+        pass
+
     # payment methods
 
     @arc4.abimethod
@@ -1432,7 +1432,10 @@ export const setRegistryResolver: any = async (
   );
   const setRegistryResolverR = await ci.setRegistryResolver(options.resolver);
   if (options.debug) {
-    if (setRegistryResolverR.success) {
+    console.log(setRegistryResolverR);
+  }
+  if (setRegistryResolverR.success) {
+    if (!options.simulate) {
       await signSendAndConfirm(setRegistryResolverR.txns, secretKey);
     }
     return true;
@@ -1448,6 +1451,52 @@ vnsCmd
   .option("--debug", "Debug the deployment", false)
   .action(setRegistryResolver);
 
+interface VNSResolvePathOptions {
+  apid: number;
+  name: string;
+  debug?: boolean;
+}
+export const resolvePath: any = async (options: VNSResolvePathOptions) => {
+  const ci = new CONTRACT(
+    Number(options.apid),
+    algodClient,
+    indexerClient,
+    makeSpec(VNSRegistrySpec.contract.methods),
+    {
+      addr: addr,
+      sk: sk,
+    }
+  );
+  // label hashes from the top level down, voi first for a.b.voi
+  const labels = options.name
+    .split(".")
+    .reverse()
+    .map((label) => hash(label));
+  const resolvePathR = await ci.resolvePath(labels);
+  if (options.debug) {
+    console.log(resolvePathR);
+  }
+  if (!resolvePathR.success) {
+    return null;
+  }
+  const [node, record, resolverNode, resolverId] = resolvePathR.returnValue;
+  return {
+    node: new Uint8Array(node),
+    record,
+    resolverNode: new Uint8Array(resolverNode),
+    resolver: resolverId,
+  };
+};
+vnsCmd
+  .command("resolve-path")
+  .description("Resolve a name and its nearest resolver in one call")
+  .requiredOption("-a, --apid <number>", "Specify the application ID")
+  .requiredOption("-n, --name <string>", "Specify the name")
+  .option("-d, --debug", "Debug the deployment", false)
+  .action(async (options: VNSResolvePathOptions) => {
+    console.log(await resolvePath(options));
+  });
+
 interface VNSOwnerOfOptions {
   apid: number;
   node?: string;
@@ -2414,6 +2463,72 @@ resolverCmd
     console.log(res);
   });
 
+interface VNSResolverAppendTextOptions {
+  apid: number;
+  node: string;
+  key: string;
+  data: string | Uint8Array;
+  extraPayment?: number;
+  debug?: boolean;
+  simulate?: boolean;
+  sender?: string;
+  sk?: Uint8Array;
+}
+
+export const appendText: any = async (
+  options: VNSResolverAppendTextOptions
+) => {
+  const address = options.sender || addr;
+  const secretKey = options.sk || sk;
+  const ci = new CONTRACT(
+    Number(options.apid),
+    algodClient,
+    indexerClient,
+    makeSpec(VNSPublicResolverSpec.contract.methods),
+    {
+      addr: address,
+      sk: secretKey,
+    }
+  );
+  if (options.extraPayment) {
+    const amountBI = BigInt(options.extraPayment);
+    ci.setPaymentAmount(Number(amountBI));
+  }
+  ci.setFee(2000);
+  const appendTextR = await ci.appendText(
+    namehash(options.node),
+    stringToUint8Array(options.key, 22),
+    typeof options.data === "string"
+      ? new Uint8Array(Buffer.from(options.data, "utf8"))
+      : options.data
+  );
+  if (options.debug) {
+    console.log(appendTextR);
+  }
+  if (appendTextR.success) {
+    if (!options.simulate) {
+      await signSendAndConfirm(appendTextR.txns, secretKey);
+    }
+    return true;
+  }
+  return false;
+};
+
+resolverCmd
+  .command("append-text")
+  .description("Append data to a text of the resolver")
+  .requiredOption("-a, --apid <number>", "The resolver ID")
+  .requiredOption("-n, --node <string>", "The node to append the text of")
+  .requiredOption("-k, --key <string>", "The key to append the text of")
+  .requiredOption("--data <string>", "The data to append")
+  .option("-p, --extra-payment <number>", "Payment covering the box MBR")
+  .option("-d, --debug", "Debug mode")
+  .option("-s, --simulate", "Simulate the transaction")
+  .action(async (options: VNSResolverAppendTextOptions) => {
+    const res = await appendText(options);
+    console.log(res);
+  });
+
 interface VNSResolverGetTextOptions {
   apid: number;
   node: string;
@@ -2548,6 +2663,74 @@ resolverCmd
     console.log(res);
   });
 
+// setRecords op kinds, RECORD_OP_* in contract.py
+export const RECORD_OP_SET_TEXT = 0;
+export const RECORD_OP_DELETE_TEXT = 1;
+export const RECORD_OP_SET_NAME = 2;
+export const RECORD_OP_SET_ADDR = 3;
+export const RECORD_OP_SET_ADDRESS = 4;
+
+interface VNSResolverRecordOp {
+  op: number;
+  key?: string;
+  coinType?: number;
+  value?: string | Uint8Array;
+}
+
+interface VNSResolverSetRecordsOptions {
+  apid: number;
+  node: string;
+  ops: VNSResolverRecordOp[];
+  extraPayment?: number;
+  debug?: boolean;
+  simulate?: boolean;
+  sender?: string;
+  sk?: Uint8Array;
+}
+
+export const setRecords: any = async (
+  options: VNSResolverSetRecordsOptions
+) => {
+  const address = options.sender || addr;
+  const secretKey = options.sk || sk;
+  const ci = new CONTRACT(
+    Number(options.apid),
+    algodClient,
+    indexerClient,
+    makeSpec(VNSPublicResolverSpec.contract.methods),
+    {
+      addr: address,
+      sk: secretKey,
+    }
+  );
+  if (options.extraPayment) {
+    const amountBI = BigInt(options.extraPayment);
+    ci.setPaymentAmount(Number(amountBI));
+  }
+  ci.setFee(2000);
+  const setRecordsR = await ci.setRecords(
+    namehash(options.node),
+    options.ops.map((op) => [
+      op.op,
+      stringToUint8Array(op.key || "", 22),
+      op.coinType || 0,
+      typeof op.value === "string"
+        ? new Uint8Array(Buffer.from(op.value, "utf8"))
+        : op.value || new Uint8Array(),
+    ])
+  );
+  if (options.debug) {
+    console.log(setRecordsR);
+  }
+  if (setRecordsR.success) {
+    if (!options.simulate) {
+      await signSendAndConfirm(setRecordsR.txns, secretKey);
+    }
+    return true;
+  }
+  return false;
+};
+
 interface VNSResolverDeleteNameOptions {
   apid: number;
   node: string;
@@ -3307,6 +3490,116 @@ registrarCmd
     console.log(res);
   });
 
+// register_batch limits and storage cost, MAX_REGISTER_BATCH and mint_cost in
+// contract.py
+export const MAX_REGISTER_BATCH = 7;
+export const mintCost = 172900;
+
+interface VNSRegistrarRegisterBatchOptions {
+  apid: number;
+  arc200: number;
+  names: string[];
+  owners: string[];
+  duration: number;
+  price: number | bigint;
+  debug?: boolean;
+  simulate?: boolean;
+  sender?: string;
+  sk?: Uint8Array;
+}
+
+export const registerBatch: any = async (
+  options: VNSRegistrarRegisterBatchOptions
+) => {
+  if (options.debug) {
+    console.log({ options });
+  }
+  const address = options.sender || addr;
+  const secretKey = options.sk || sk;
+  const ci = new CONTRACT(
+    Number(options.apid),
+    algodClient,
+    indexerClient,
+    abi.custom,
+    {
+      addr: address,
+      sk: secretKey,
+    }
+  );
+  const builder = {
+    arc200: new CONTRACT(
+      Number(options.arc200),
+      algodClient,
+      indexerClient,
+      abi.nt200,
+      {
+        addr: address,
+        sk: secretKey,
+      },
+      true,
+      false,
+      true
+    ),
+    registrar: new CONTRACT(
+      Number(options.apid),
+      algodClient,
+      indexerClient,
+      makeSpec(VNSRegistrarSpec.contract.methods),
+      {
+        addr: address,
+        sk: secretKey,
+      },
+      true,
+      false,
+      true
+    ),
+  };
+  // approve the fees, pay mint_cost per name and register, the beacon calls
+  // added by the group resource sharing carry the remaining box references
+  const buildN = [];
+  {
+    const txnO = (
+      await builder.arc200.arc200_approve(
+        algosdk.getApplicationAddress(Number(options.apid)),
+        options.price
+      )
+    )?.obj;
+    buildN.push({
+      ...txnO,
+      payment: 28500,
+    });
+  }
+  {
+    const txnO = (
+      await builder.registrar.register_batch(
+        options.names.map((name) => stringToUint8Array(name, 32)),
+        options.owners,
+        options.duration
+      )
+    )?.obj;
+    buildN.push({
+      ...txnO,
+      payment: mintCost * options.names.length,
+    });
+  }
+  // one inner call per name to the registry and one to the payment token
+  ci.setFee(1000 * (options.names.length + 10));
+  ci.setBeaconId(Number(options.apid));
+  ci.setEnableGroupResourceSharing(true);
+  ci.setExtraTxns(buildN);
+  const customR = await ci.custom();
+  if (options.debug) {
+    console.log(customR);
+  }
+  if (customR.success) {
+    if (!options.simulate) {
+      await signSendAndConfirm(customR.txns, secretKey);
+    }
+    return true;
+  }
+  return false;
+};
+
 interface VNSRegistrarDeleteNFTDataOptions {
   apid: number;
   name: string;
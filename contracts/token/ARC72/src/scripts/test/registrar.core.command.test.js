@@ -47,6 +47,8 @@ import {
   reclaim,
   resolveAddr,
   setAddr,
+  registerBatch,
+  MAX_REGISTER_BATCH,
 } from "../command.js";
 import moment from "moment";
 import algosdk from "algosdk";
@@ -390,6 +392,59 @@ describe("VNSRegistry:core:registrar Test Suite", function () {
     expect(success).to.be.eq(true);
   });
 
+  // register batch
+  it("can register the maximum batch in one group", async function () {
+    const names = Array.from(
+      { length: MAX_REGISTER_BATCH },
+      (_, i) => `batch${i}`
+    );
+    const prices = await Promise.all(
+      names.map((name) =>
+        getPrice({
+          apid: fixtureData.apps.vnsRegistrar,
+          name,
+          duration: fixtureData.context.duration,
+        })
+      )
+    );
+    const success = await registerBatch({
+      apid: fixtureData.apps.vnsRegistrar,
+      arc200: fixtureData.apps.arc200,
+      names,
+      owners: names.map(() => addresses.deployer),
+      duration: fixtureData.context.duration,
+      price: prices.reduce((acc, price) => acc + BigInt(price), BigInt(0)),
+      sender: addresses.deployer,
+      sk: sks.deployer,
+    });
+    expect(success).to.be.eq(true);
+    for (const name of names) {
+      const ownerR = await ownerOf({
+        apid: fixtureData.apps.vnsRegistry,
+        node: `${name}.voi`,
+      });
+      expect(ownerR).to.be.eq(addresses.deployer);
+    }
+  });
+  it("cannot register more than the maximum batch", async function () {
+    const names = Array.from(
+      { length: MAX_REGISTER_BATCH + 1 },
+      (_, i) => `overbatch${i}`
+    );
+    const success = await registerBatch({
+      apid: fixtureData.apps.vnsRegistrar,
+      arc200: fixtureData.apps.arc200,
+      names,
+      owners: names.map(() => addresses.deployer),
+      duration: fixtureData.context.duration,
+      price: 0,
+      sender: addresses.deployer,
+      sk: sks.deployer,
+      simulate: true,
+    });
+    expect(success).to.be.eq(false);
+  });
+
   // can get length
   // {
   //   const topic = "can get length";
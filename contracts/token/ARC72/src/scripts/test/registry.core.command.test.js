@@ -23,6 +23,8 @@ import {
   bytesToHex,
   extraPageCost,
   ALGORAND_ZERO_ADDRESS_STRING,
+  setRegistryResolver,
+  resolvePath,
 } from "../command.js";
 import moment from "moment";
 import algosdk from "algosdk";
@@ -432,6 +434,48 @@ describe("VNSRegistry:core:registry Test Suite", function () {
     expect(ownerR7).to.be.eq(addresses.deployer);
   });
 
+  it("resolvePath skips missing ancestors with a default resolver", async function () {
+    const setResolverR = await setResolver({
+      apid: fixtureData.apps.vnsRegistry,
+      node: "nshell.voi",
+      resolver: 5,
+      sender: addresses.registrar,
+      sk: sks.registrar,
+    });
+    expect(setResolverR).to.be.eq(true);
+    const setRegistryResolverR = await setRegistryResolver({
+      apid: fixtureData.apps.vnsRegistry,
+      resolver: 7,
+    });
+    expect(setRegistryResolverR).to.be.eq(true);
+    // missing.b.a.nshell.voi has no record, b and a have no resolver
+    const resolvePathR = await resolvePath({
+      apid: fixtureData.apps.vnsRegistry,
+      name: "missing.b.a.nshell.voi",
+    });
+    expect(bytesToHex(resolvePathR.node)).to.be.eq(
+      bytesToHex(namehash("missing.b.a.nshell.voi"))
+    );
+    expect(bytesToHex(resolvePathR.resolverNode)).to.be.eq(
+      bytesToHex(namehash("nshell.voi"))
+    );
+    expect(resolvePathR.resolver).to.be.eq(BigInt(5));
+    // no node on the path has a record, the registry resolver applies
+    const resolvePathR2 = await resolvePath({
+      apid: fixtureData.apps.vnsRegistry,
+      name: "missing.nowhere",
+    });
+    expect(bytesToHex(resolvePathR2.resolverNode)).to.be.eq(
+      bytesToHex(new Uint8Array(32))
+    );
+    expect(resolvePathR2.resolver).to.be.eq(BigInt(7));
+    const resetRegistryResolverR = await setRegistryResolver({
+      apid: fixtureData.apps.vnsRegistry,
+      resolver: 0,
+    });
+    expect(resetRegistryResolverR).to.be.eq(true);
+  });
+
   // owner can approve
   // approved can set owner
   // approved can set resolver
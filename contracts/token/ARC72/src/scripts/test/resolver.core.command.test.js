@@ -27,6 +27,12 @@ import {
   setAddr,
   resolveAddr,
   resolveName,
+  setName,
+  deleteName,
+  setRecords,
+  appendText,
+  stringToUint8Array,
+  RECORD_OP_SET_NAME,
 } from "../command.js";
 import moment from "moment";
 import algosdk from "algosdk";
@@ -40,6 +46,12 @@ const baseFixtureData = {
   context: {},
 };
 
+// name box and its entry in the record key list, 2500 + 400 * (key + value)
+const nameBoxCost = 2500 + 400 * (46 + 256) + 400 * 23;
+
+// appendText payment for a new text box, its 65 byte key and record key entry
+const textBoxCost = (length) => 2500 + 400 * (65 + length + 23);
+
 // Path : VNSRegistry
 
 describe("VNSRegistry:core:resolver Test Suite", function () {
@@ -75,6 +87,10 @@ describe("VNSRegistry:core:resolver Test Suite", function () {
       apid: fixtureData.apps.vnsResolver,
       node: "voi",
     });
+    const deleteNameR = await deleteName({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+    });
     const killApplicationR = await killApplication({
       apid: fixtureData.apps.vnsRegistry,
       delete: true,
@@ -84,6 +100,7 @@ describe("VNSRegistry:core:resolver Test Suite", function () {
       delete: true,
     });
     expect(killAddrR).to.be.eq(true);
+    expect(deleteNameR).to.be.eq(true);
     expect(killApplicationR).to.be.eq(true);
     expect(killApplicationR2).to.be.eq(true);
     console.log("Happily ever after");
@@ -168,4 +185,83 @@ describe("VNSRegistry:core:resolver Test Suite", function () {
     console.log(resolveNameR);
   });
   // set name
+  it("owner can set name with setRecords, no existing name", async function () {
+    const setRecordsR = await setRecords({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+      ops: [{ op: RECORD_OP_SET_NAME, value: "voi" }],
+      extraPayment: nameBoxCost,
+      sender: addresses.deployer,
+      sk: sks.deployer,
+    });
+    expect(setRecordsR).to.be.eq(true);
+    const resolveNameR = await resolveName({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+    });
+    expect(Buffer.from(resolveNameR).toString("hex")).to.be.eq(
+      Buffer.from(stringToUint8Array("voi", 256)).toString("hex")
+    );
+  });
+  it("owner can set name with setRecords, existing name", async function () {
+    const setNameR = await setName({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+      name: "existing-name.voi",
+      sender: addresses.deployer,
+      sk: sks.deployer,
+    });
+    expect(setNameR).to.be.eq(true);
+    const setRecordsR = await setRecords({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+      ops: [{ op: RECORD_OP_SET_NAME, value: "voi" }],
+      sender: addresses.deployer,
+      sk: sks.deployer,
+    });
+    expect(setRecordsR).to.be.eq(true);
+    const resolveNameR = await resolveName({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+    });
+    expect(Buffer.from(resolveNameR).toString("hex")).to.be.eq(
+      Buffer.from(stringToUint8Array("voi", 256)).toString("hex")
+    );
+  });
+  // append text
+  it("owner cannot append text without payment", async function () {
+    const appendTextR = await appendText({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+      key: "description",
+      data: "a".repeat(300),
+      sender: addresses.deployer,
+      sk: sks.deployer,
+    });
+    expect(appendTextR).to.be.eq(false);
+  });
+  it("owner can append text with payment", async function () {
+    const appendTextR = await appendText({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+      key: "description",
+      data: "a".repeat(300),
+      extraPayment: textBoxCost(300),
+      sender: addresses.deployer,
+      sk: sks.deployer,
+    });
+    expect(appendTextR).to.be.eq(true);
+  });
+  it("owner cannot grow text without covering the growth", async function () {
+    const appendTextR = await appendText({
+      apid: fixtureData.apps.vnsResolver,
+      node: "voi",
+      key: "description",
+      data: "b".repeat(100),
+      extraPayment: 400 * 100 - 1,
+      sender: addresses.deployer,
+      sk: sks.deployer,
+    });
+    expect(appendTextR).to.be.eq(false);
+  });
 });
@@ -0,0 +1,205 @@
+import base64
+import io
+
+from bench.metrics import (
+    Measurement,
+    app_ids,
+    box_bytes_read,
+    box_min_balance,
+    measure,
+)
+from bench.report import compare, load_report, write_report
+
+APP = 1001
+INNER_APP = 1002
+
+# pushint 1; box_get at pc 2; box_extract at pc 3; box_replace at pc 4
+PROGRAM = bytes([0x81, 0x01, 0xBE, 0xBA, 0xBB])
+PROGRAMS = {APP: PROGRAM, INNER_APP: PROGRAM}
+
+
+def b64(value: bytes) -> str:
+    return base64.b64encode(value).decode()
+
+
+def write(key: bytes, value: bytes) -> dict:
+    return {
+        "app-state-type": "b",
+        "key": b64(key),
+        "operation": "w",
+        "new-value": {"bytes": b64(value)},
+    }
+
+
+def delete(key: bytes) -> dict:
+    return {"app-state-type": "b", "key": b64(key), "operation": "d"}
+
+
+def step(pc: int, *changes: dict, pushed: tuple[bytes, ...] = ()) -> dict:
+    return {
+        "pc": pc,
+        "state-changes": list(changes),
+        "stack-additions": [{"type": 1, "bytes": b64(value)} for value in pushed],
+    }
+
+
+def simulate_response(failure: str | None = None) -> dict:
+    # reads 8 bytes of a with box_get and 3 bytes of c with box_extract,
+    # writes a and b, rewrites a, deletes c, and writes d in an inner call
+    # after reading 2 bytes of it
+    group = {
+        "txn-results": [
+            {
+                "app-budget-consumed": 1500,
+                "txn-result": {
+                    "txn": {"txn": {"apid": APP}},
+                    "inner-txns": [{"txn": {"txn": {"apid": INNER_APP}}}],
+                },
+                "exec-trace": {
+                    "approval-program-trace": [
+                        step(0, pushed=(bytes(1),)),  # pushint is not a read
+                        step(2, pushed=(bytes(8),)),
+                        step(3, pushed=(bytes(3),)),
+                        step(0, write(b"a", bytes(8))),
+                        step(0, write(b"b", bytes(32))),
+                        step(0, write(b"a", bytes(16))),
+                        step(0, delete(b"c")),
+                        step(0, {"app-state-type": "g", "key": ""}),
+                    ],
+                    "inner-trace": [
+                        {
+                            "approval-program-trace": [
+                                step(3, pushed=(bytes(2),)),
+                                step(0, write(b"d", bytes(4))),
+                            ]
+                        }
+                    ],
+                },
+                "unnamed-resources-accessed": {
+                    "boxes": [{"app": APP, "name": b64(b"a")}]
+                },
+            }
+        ],
+        "unnamed-resources-accessed": {
+            "boxes": [
+                {"app": APP, "name": b64(b"c")},
+                {"app": APP, "name": b64(b"b")},
+            ],
+            "extra-box-refs": 1,
+        },
+    }
+    if failure:
+        group["failure-message"] = failure
+    return {"txn-groups": [group]}
+
+
+BOX_SIZES = {
+    (APP, b"a"): 8,  # rewritten
+    (APP, b"b"): None,  # created
+    (APP, b"c"): 100,  # deleted
+    (INNER_APP, b"d"): None,  # created by the inner call
+}
+
+
+def measurement(name: str = "scenario", **metrics) -> Measurement:
+    values = {
+        "opcode_cost": 100,
+        "box_reads": 2,
+        "box_bytes_read": 64,
+        "box_refs": 2,
+        "box_writes": 1,
+        "box_bytes_written": 32,
+        "box_deletes": 0,
+        "inner_txns": 0,
+        "mbr_delta": 0,
+    }
+    values.update(metrics)
+    return Measurement(name=name, method="method", app_id=APP, **values)
+
+
+def test_box_min_balance():
+    assert box_min_balance(b"key", None) == 0
+    assert box_min_balance(b"key", 0) == 2500 + 400 * 3
+    assert box_min_balance(b"key", 32) == 2500 + 400 * 35
+
+
+def test_app_ids():
+    assert app_ids(simulate_response(), 0, APP) == {APP, INNER_APP}
+
+
+def test_measure():
+    response = simulate_response()
+    m = measure("scenario", "method", APP, response, 0, BOX_SIZES, PROGRAMS)
+    assert m.opcode_cost == 1500
+    assert m.box_reads == 2  # a and c existed, b was created
+    assert m.box_bytes_read == 8 + 3 + 2  # not the 108 bytes of a and c
+    assert m.box_refs == 3 + 1
+    assert m.box_writes == 4
+    assert m.box_bytes_written == 8 + 32 + 16 + 4
+    assert m.box_deletes == 1
+    assert m.inner_txns == 1
+    assert m.mbr_delta == (
+        400 * (16 - 8)  # a grew
+        + box_min_balance(b"b", 32)
+        - box_min_balance(b"c", 100)
+        + box_min_balance(b"d", 4)
+    )
+    assert m.failure is None
+
+
+def test_box_bytes_read_ignores_box_replace():
+    trace = {
+        "approval-program-trace": [
+            step(4, pushed=(bytes(16),)),  # box_replace
+            step(3, pushed=(bytes(5),)),  # box_extract
+        ]
+    }
+    response = {
+        "txn-groups": [
+            {
+                "txn-results": [
+                    {
+                        "txn-result": {"txn": {"txn": {"apid": APP}}},
+                        "exec-trace": trace,
+                    }
+                ]
+            }
+        ]
+    }
+    assert box_bytes_read(response, 0, APP, PROGRAMS) == 5
+
+
+def test_measure_failure():
+    response = simulate_response("rejected")
+    m = measure("scenario", "method", APP, response, 0, {}, {})
+    assert m.failure == "rejected"
+
+
+def test_report_round_trip():
+    target = io.StringIO()
+    write_report([measurement("a"), measurement("b")], target, network="localnet")
+    results = load_report(io.StringIO(target.getvalue()))
+    assert list(results) == ["a", "b"]
+    assert results["a"]["opcode_cost"] == 100
+    assert results["a"]["failure"] is None
+
+
+def test_compare():
+    target = io.StringIO()
+    write_report([measurement("a"), measurement("b")], target)
+    baseline = load_report(io.StringIO(target.getvalue()))
+    assert compare([measurement("a"), measurement("new")], baseline) == []
+    assert compare([measurement("a", opcode_cost=104)], baseline, 0.05) == []
+    assert compare([measurement("a", opcode_cost=106)], baseline, 0.05) == [
+        "a: opcode_cost 100 -> 106"
+    ]
+    assert compare([measurement("a", mbr_delta=-2500)], baseline) == []
+    assert compare([measurement("a", mbr_delta=2500)], baseline, 0.5) == [
+        "a: mbr_delta 0 -> 2500"
+    ]
+
+
+def test_compare_failure():
+    failed = measurement("a")
+    failed.failure = "rejected"
+    assert compare([failed], {}) == ["a: failed: rejected"]
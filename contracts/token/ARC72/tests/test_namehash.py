@@ -0,0 +1,89 @@
+import io
+
+import pytest
+
+from namehash.bulk import hash_csv, hash_names
+from namehash.core import js_integer, namehash
+
+# vectors from src/scripts/test/namehash.command.test.js
+TEXT_VECTORS = {
+    "": "0000000000000000000000000000000000000000000000000000000000000000",
+    "hi": "cf785791e1e0a0c644540a083666e8f82524edd2abab893e95ed03dacfe838c3",
+    "voi": "b450c7e69b509b3d8c47d59c1cf8f6b141fe78244c5fd37df696a8bda7b0d541",
+    "nshell.voi": "fc2a2092c76b2020fa47eba60c78705bf7d307aafac450f34959e0e63c8a4323",
+    "asdfasdf.voi": "9bae76fafbe6308850e646cdc45b750a9f5a52ea10fd03d20adae116ac0c188d",
+}
+
+# namehash in src/scripts/command.ts
+NUMERIC_VECTORS = {
+    "1337.voi": "665a3a1deb974b80a918c864961b385c08fc6ae3e8ac20f042ae429b48affcfb",
+    "16.voi": "0b4906e3ad22d7f2d3ad53e7c932465777e35349966e8ce61f7ebaad20ae46a6",
+    "0x10.voi": "0b4906e3ad22d7f2d3ad53e7c932465777e35349966e8ce61f7ebaad20ae46a6",
+    "-1.voi": "1df32952731840bcd8e983c36aa43549e02d650882935091623a57f9537c634b",
+}
+
+
+@pytest.mark.parametrize("name,node", TEXT_VECTORS.items())
+def test_namehash_text(name, node):
+    assert namehash(name).hex() == node
+    assert namehash(name, numeric=True).hex() == node
+
+
+@pytest.mark.parametrize("name,node", NUMERIC_VECTORS.items())
+def test_namehash_numeric(name, node):
+    assert namehash(name, numeric=True).hex() == node
+
+
+def test_namehash_numbers_hashed_as_text_by_default():
+    # as VNSRegistrar hashes labels
+    node = "d54dc2d5377aa5da0799deecfaf0fc0c35418f8a5649e2799c38262e18d978f7"
+    assert namehash("1337.voi").hex() == node
+
+
+@pytest.mark.parametrize(
+    "label,value",
+    [
+        ("1337", 1337),
+        ("007", 7),
+        ("+5", 5),
+        ("-1", -1),
+        ("-0", 0),
+        ("0x10", 16),
+        ("0XfF", 255),
+        ("0o17", 15),
+        ("0b101", 5),
+        (" 42\n", 42),
+        ("\u00a042\ufeff", 42),
+        ("   ", 0),
+        ("abc", None),
+        ("0x", None),
+        ("+0x10", None),
+        ("1_000", None),
+        ("NaN", None),
+        ("\u0661\u0662", None),
+    ],
+)
+def test_js_integer(label, value):
+    assert js_integer(label) == value
+
+
+@pytest.mark.parametrize("label", ["1.5", "1e3", ".5", "5.", "Infinity"])
+def test_js_integer_rejects_non_integers(label):
+    with pytest.raises(ValueError):
+        js_integer(label)
+
+
+def test_hash_names_keeps_order():
+    names = [f"n{i}.voi" for i in range(25)]
+    hashed = list(hash_names(names, workers=2, chunk_size=4))
+    assert [name for name, _node in hashed] == names
+    assert all(node == namehash(name) for name, node in hashed)
+
+
+def test_hash_csv():
+    target = io.StringIO()
+    count = hash_csv(io.StringIO("hi,1\n\nvoi 2\n"), target, workers=1)
+    assert count == 2
+    assert target.getvalue() == (
+        f"hi,{TEXT_VECTORS['hi']}\nvoi,{TEXT_VECTORS['voi']}\n"
+    )